@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""
+ColoredLogFormatter throughput: the original per-record implementation
+against the current precompiled one.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_colored_formatter.py [records]
+"""
+
+import os
+import sys
+import logging
+from time import perf_counter
+from datetime import datetime as dt
+from logging import Formatter
+
+from physocts.log import ColoredLogFormatter
+
+
+class LegacyColoredLogFormatter(Formatter):
+    """`ColoredLogFormatter` as it was before it was precompiled; the time is
+    taken from the record to make the outputs comparable"""
+    def __init__(self, datefmt=None):
+
+        self.main_pid = os.getpid()
+
+        super().__init__(fmt="%(message)s", datefmt=datefmt)
+
+    def format(self, record):
+        fmt = type("TextFormat", (object, ), {
+            "normal": "{:s}",
+            "caption": type("TextFormatCaption", (object, ), {
+                "debug": "\033[34;7;1m{: ^9.7s}\033[0m",
+                "info": "\033[35;7;1m{: ^9.7s}\033[0m",
+                "warning": "\033[33;7;1m{: ^9.7s}\033[0m",
+                "error": "\033[31;7;1m{: ^9.7s}\033[0m",
+                "critical": "\033[31;7;1m{: ^9.7s}\033[0m",
+                "log": "\033[37;7;1m{: ^10.8s}\033[0m"}),
+            "trace_info": "\033[37;3;2m{:s}\033[0m",
+            "process": "\033[43;100;1m PID:{:s} \033[0m",
+            "thread": "\033[43;100;1m Thread:{:s} \033[0m"})
+
+        message = fmt.normal.format(record.getMessage())
+        thread_name = record.threadName
+        if thread_name != "MainThread":
+            thread = fmt.thread.format(thread_name)
+        else:
+            thread = ""
+
+        indent = ""
+
+        if self.main_pid != record.process:
+            process = fmt.process.format(str(record.process))
+        else:
+            process = ""
+
+        cur_time = fmt.trace_info.format(dt.fromtimestamp(record.created).isoformat())
+
+        path_name = record.pathname
+        func_name = fmt.trace_info.format(record.funcName)
+        line_no = fmt.trace_info.format(str(record.lineno))
+
+        cur_format = getattr(fmt.caption, record.levelname.lower(), fmt.caption.log)
+        level_name = cur_format.format(record.levelname)
+
+        message = f"\033[0m{indent}{cur_time} " \
+                  f"{path_name}.{func_name}:{line_no}\n" \
+                  f"{process}{thread}{level_name} {message}"
+
+        return message
+
+
+def make_records(n):
+    """records spread over levels, call sites and seconds"""
+    levels = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, 5]
+    records = []
+    for i in range(n):
+        record = logging.LogRecord(
+            "soners", levels[i % len(levels)], __file__, 10 + i % 7,
+            "message %d: %r", (i, {"key": i}), None, func="make_records")
+        record.created = 1600000000 + i/1000
+        if i % 3:
+            record.threadName = "Worker-%d" % (i % 4)
+        records.append(record)
+    return records
+
+
+def measure(formatter, records):
+    """records per second"""
+    t = perf_counter()
+    for record in records:
+        formatter.format(record)
+    return len(records)/(perf_counter() - t)
+
+
+def main(n=100000):
+    records = make_records(n)
+    legacy, current = LegacyColoredLogFormatter(), ColoredLogFormatter()
+
+    assert all(legacy.format(r) == current.format(r) for r in records), "outputs differ"
+
+    before = measure(legacy, records)
+    after = measure(current, records)
+    print(f"legacy:   {before:12.0f} records/s")
+    print(f"compiled: {after:12.0f} records/s")
+    print(f"speedup:  {after/before:12.2f}x")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""
+`json_ext` with every installed JSON backend on small, wide and deeply
+nested documents.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_json_backends.py [repeats]
+"""
+
+import sys
+from time import perf_counter
+
+from physocts import json_ext, json_backend
+
+DOCUMENTS = {
+    "small": {"id": 1, "name": "name", "tags": ["a", "b"], "score": 0.5, "ok": True},
+    "wide": {f"key_{i}": {"id": i, "name": "ü" * (i % 10), "values": list(range(10))}
+             for i in range(2000)},
+    "deep": {}}
+
+_node = DOCUMENTS["deep"]
+for _i in range(200):
+    _node["child"] = {"level": _i, "items": [_i, str(_i)]}
+    _node = _node["child"]
+
+
+def per_call(f, repeats):
+    """microseconds per call"""
+    t = perf_counter()
+    for _ in range(repeats):
+        assert f()
+    return (perf_counter() - t)/repeats*1e6
+
+
+def main(repeats=200):
+    for name in json_backend.available_backends():
+        json_backend.set_backend(name)
+        print(f"--- {name}")
+        for doc_name, doc in DOCUMENTS.items():
+            text = json_ext.flat(doc).value
+            loads = per_call(lambda: json_ext.try_loads(text) is not None, repeats)
+            flat = per_call(lambda: json_ext.flat(doc), repeats)
+            compact = per_call(
+                lambda: json_ext.flat(doc, separators=(",", ":"), ensure_ascii=False), repeats)
+            print(f"{doc_name:>6}: loads {loads:10.1f} us, flat {flat:10.1f} us, "
+                  f"compact {compact:10.1f} us")
+    json_backend.set_backend()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
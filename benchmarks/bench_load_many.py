@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+"""
+`json_ext.load_many` scaling with the number of workers against a plain
+`json_ext.load` loop on many small files.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_load_many.py [files]
+"""
+
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from physocts import json_ext
+
+
+def main(files=10000):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        flnms = [os.path.join(tmp_dir, f"{i}.json") for i in range(files)]
+        for i, flnm in enumerate(flnms):
+            assert json_ext.write({"id": i, "name": f"item {i}", "values": list(range(20))}, flnm)
+
+        t = perf_counter()
+        assert all(json_ext.load(flnm) for flnm in flnms)
+        print(f"{'sequential':>8}: {files/(perf_counter() - t):10.0f} files/s")
+
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            for mode in ["thread", "process"]:
+                t = perf_counter()
+                assert all(json_ext.load_many(flnms, workers=workers, mode=mode))
+                print(f"{mode:>8}: {files/(perf_counter() - t):10.0f} files/s, {workers} workers")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+"""
+Logging throughput and latency for every handler setup.
+
+Reports records per second and p50/p99 per-record latency for 1, 4 and 16
+threads as JSON; with `--baseline` the report is compared against a saved one
+and the exit status is 1 if some setup got slower than `--threshold`.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_log.py --output baseline.json
+    $ PYTHONPATH=. python3 benchmarks/bench_log.py --baseline baseline.json
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import tempfile
+import threading
+from time import perf_counter, perf_counter_ns
+from contextlib import contextmanager
+
+from physocts import log, simple_log
+
+THREADS = (1, 4, 16)
+
+
+def _simple_log_setup(_):
+    simple_log.enable_simple_log()
+    simple_log.enable_simple_log_info()
+    return lambda i: simple_log.info("record %d: %s", i, "payload")
+
+
+def _logger_setup(enable):
+    def setup(tmp_dir):
+        logger = log.get_logger()
+        log.clear_logger(logger)
+        logger.setLevel(logging.INFO)
+        enable(tmp_dir)
+        return lambda i: logger.info("record %d: %s", i, "payload")
+    return setup
+
+
+SETUPS = {
+    "stdout": _logger_setup(lambda _: log.enable_stdout(logging.INFO)),
+    "stderr": _logger_setup(lambda _: log.enable_stderr(logging.INFO)),
+    "stderr_async": _logger_setup(lambda _: log.enable_stderr(logging.INFO, async_=True)),
+    "file": _logger_setup(
+        lambda d: log.enable_file(logging.INFO, os.path.join(d, "file.log"))),
+    "rotating_file": _logger_setup(
+        lambda d: log.enable_rotating_file(
+            logging.INFO, os.path.join(d, "rotating.log"), max_size=256*1024, backupCount=2)),
+    "jsonl_file": _logger_setup(
+        lambda d: log.enable_jsonl_file(
+            logging.INFO, os.path.join(d, "log.jsonl"), max_size=256*1024, backupCount=2)),
+    "simple_log": _simple_log_setup}
+
+
+@contextmanager
+def _devnull_std_streams():
+    """console handlers write to /dev/null while measuring"""
+    std_streams = (sys.stdout, sys.stderr)
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        sys.stdout = sys.stderr = devnull
+        try:
+            yield
+        finally:
+            (sys.stdout, sys.stderr) = std_streams
+
+
+def _percentile(xs, p):
+    return xs[min(len(xs) - 1, int(len(xs)*p))]
+
+
+def measure(setup, records: int, threads: int) -> dict:
+    """records per second and per-record latency in microseconds"""
+
+    latencies = [[] for _ in range(threads)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir, _devnull_std_streams():
+        emit = setup(tmp_dir)
+
+        def work(lat):
+            for i in range(records//threads):
+                t = perf_counter_ns()
+                emit(i)
+                lat.append(perf_counter_ns() - t)
+
+        workers = [threading.Thread(target=work, args=(lat, )) for lat in latencies]
+        t = perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        for hlr in log.clear_logger()["handlers"]:
+            hlr.close()
+        elapsed = perf_counter() - t
+
+    lat = sorted(sum(latencies, []))
+    return {
+        "records_per_sec": len(lat)/elapsed,
+        "p50_us": _percentile(lat, 0.5)/1e3,
+        "p99_us": _percentile(lat, 0.99)/1e3}
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """setups which throughput dropped more than `threshold` of the baseline"""
+    regressions = []
+    for name, runs in report.items():
+        for threads, res in runs.items():
+            if (base := baseline.get(name, {}).get(threads)) is None:
+                continue
+            ratio = res["records_per_sec"]/base["records_per_sec"]
+            res["vs_baseline"] = ratio
+            if ratio < 1 - threshold:
+                regressions.append(f"{name}/{threads} threads: {ratio:.2f}x of the baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--setups", nargs="*", default=list(SETUPS), choices=list(SETUPS))
+    parser.add_argument("--output", help="write the report to a file")
+    parser.add_argument("--baseline", help="compare against a saved report")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed throughput drop, a fraction of the baseline")
+    args = parser.parse_args()
+
+    report = {name: {str(threads): measure(SETUPS[name], args.records, threads)
+                     for threads in THREADS}
+              for name in args.setups}
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fid:
+            regressions = compare(report, json.load(fid), args.threshold)
+
+    out = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fid:
+            fid.write(out)
+    print(out)
+
+    for regression in regressions:
+        print("REGRESSION: " + regression, file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
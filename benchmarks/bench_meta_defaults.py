@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""
+`DataMeta` instances with a large default document: time and allocated
+memory per instance with the shared copy-on-write defaults and with the
+defaults deep-copied per instance.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_meta_defaults.py [instances]
+"""
+
+import sys
+import copy
+import tracemalloc
+from time import perf_counter
+
+from physocts.meta import DataMeta
+from physocts.dict_ext import dict_join
+
+DEFAULT_DATA = {
+    f"section_{i}": {
+        "enabled": True,
+        "name": f"section {i}",
+        "limits": {"min": 0, "max": 100, "step": 0.5},
+        "tags": ["a", "b", "c"]}
+    for i in range(200)}
+
+DATA = {"section_0": {"enabled": False}, "id": 1}
+
+
+def legacy_init(obj, data=None):
+    """the defaults deep-copied per instance"""
+    obj._data = dict_join(copy.deepcopy(obj._default_data), data or {})  # pylint: disable=W0212
+    obj._dirty = None  # pylint: disable=W0212
+
+
+def measure(cls, instances):
+    """microseconds and bytes per instance"""
+    t = perf_counter()
+    for _ in range(instances):
+        cls(DATA)
+    elapsed = perf_counter() - t
+
+    tracemalloc.start()
+    kept = [cls(DATA) for _ in range(instances)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(kept) == instances
+
+    return (elapsed/instances*1e6, size/instances)
+
+
+def main(instances=1000):
+    cls = DataMeta(None, DEFAULT_DATA)
+    legacy_cls = type("Legacy", (cls, ), {"__init__": legacy_init})
+    assert dict(cls(DATA)) == dict(legacy_cls(DATA))
+
+    for name, cur_cls in [("copy-on-write", cls), ("deepcopy", legacy_cls)]:
+        (us, size) = measure(cur_cls, instances)
+        print(f"{name:>14}: {us:10.1f} us, {size:10.0f} bytes per instance")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+"""
+`meta.from_many` rows per second on the nested order schema of
+`bench_meta_validation` with 1 to `os.cpu_count()` worker processes, and
+one instance at a time for comparison.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_meta_from_many.py [rows]
+"""
+
+import os
+import sys
+from time import perf_counter
+
+from bench_meta_validation import SCHEMA, VALID, INVALID
+
+from physocts.meta import DataMeta, is_valid, from_many
+
+
+def main(rows=4000):
+    cls = DataMeta(SCHEMA)
+    data = [INVALID if i % 10 == 0 else VALID for i in range(rows)]
+
+    t = perf_counter()
+    valid = sum(1 for row in data if is_valid(cls(row)))
+    print(f"{'one by one':>12}: {rows/(perf_counter() - t):10.0f} rows/s, {valid} valid")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        t = perf_counter()
+        valid = sum(1 for res in from_many(cls, data, workers=workers) if res)
+        print(f"{workers:>4} workers: {rows/(perf_counter() - t):10.0f} rows/s, {valid} valid")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""
+`DataMeta` attribute reads along nested paths of 1 to 8 levels, with the
+shared nested proxy type and with a new proxy type made on every read.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_meta_getattr.py [repeats]
+"""
+
+import sys
+from functools import reduce
+from time import perf_counter
+
+from physocts.meta import DataMeta, META_INST_NAME
+
+DEPTHS = (1, 2, 4, 8)
+KEYS = "abcdefgh"
+
+
+def legacy_getattr(obj, name):
+    """a proxy type created per read"""
+    cur_dict = obj._data  # pylint: disable=W0212
+    if not name in cur_dict.keys():
+        return None
+    data = cur_dict[name]
+    if not isinstance(data, dict):
+        return data
+    return type(META_INST_NAME, (object, ),
+                {**DataMeta.METHODS, "__getattr__": legacy_getattr,
+                 "__init__": DataMeta.cls_init_no_copy})(data)
+
+
+def nested(depth):
+    return reduce(lambda data, key: {key: data}, reversed(KEYS[:depth]), 1)
+
+
+def reads_per_second(inst, depth, repeats):
+    path = KEYS[:depth]
+    t = perf_counter()
+    for _ in range(repeats):
+        assert reduce(getattr, path, inst) == 1
+    return repeats/(perf_counter() - t)
+
+
+def main(repeats=20000):
+    cls = DataMeta()
+    legacy_cls = type("Legacy", (cls, ), {"__getattr__": legacy_getattr})
+
+    for depth in DEPTHS:
+        data = nested(depth)
+        shared = reads_per_second(cls(data), depth, repeats)
+        legacy = reads_per_second(legacy_cls(data), depth, repeats)
+        print(f"depth {depth}: shared type {shared:10.0f} paths/s, "
+              f"type per read {legacy:10.0f} paths/s, x{shared/legacy:.1f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""
+`DataMeta` validations per second on a nested order schema: valid and
+invalid data, `validate(inst, full=True)`, `bool(inst)` after a single leaf
+is set, `is_valid(inst)` and `errors(inst)` against `jsonschema.validate`
+called every time.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_meta_validation.py [repeats]
+"""
+
+import sys
+import logging
+from time import perf_counter
+from functools import partial
+
+import jsonschema
+
+from physocts import log
+from physocts.meta import DataMeta, validate, is_valid, errors
+
+ADDRESS = {
+    "type": "object",
+    "properties": {
+        "street": {"type": "string", "minLength": 1},
+        "city": {"type": "string"},
+        "zip": {"type": "string", "pattern": "^[0-9]{5}$"}},
+    "required": ["street", "city"]}
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer", "minimum": 1},
+        "status": {"enum": ["new", "paid", "shipped"]},
+        "customer": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "email": {"type": "string", "pattern": "^[^@]+@[^@]+$"},
+                "addresses": {"type": "array", "items": ADDRESS}},
+            "required": ["name", "email"]},
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "sku": {"type": "string"},
+                    "qty": {"type": "integer", "minimum": 1},
+                    "price": {"type": "number", "exclusiveMinimum": 0},
+                    "tags": {"type": "array", "items": {"type": "string"}}},
+                "required": ["sku", "qty", "price"]}}},
+    "required": ["id", "status", "customer", "items"]}
+
+VALID = {
+    "id": 1,
+    "status": "paid",
+    "customer": {
+        "name": "name",
+        "email": "name@example.com",
+        "addresses": [{"street": "street", "city": "city", "zip": "12345"}] * 2},
+    "items": [{"sku": f"sku-{i}", "qty": i + 1, "price": 9.99, "tags": ["a", "b"]}
+              for i in range(20)]}
+
+INVALID = {**VALID, "items": VALID["items"] + [{"sku": "x", "qty": 0, "price": -1}]}
+
+
+def per_second(f, repeats):
+    t = perf_counter()
+    for _ in range(repeats):
+        f()
+    return repeats/(perf_counter() - t)
+
+
+def main(repeats=2000):
+    log.get_logger().setLevel(logging.CRITICAL)
+    cls = DataMeta(SCHEMA)
+
+    for name, data in [("valid", VALID), ("invalid", INVALID)]:
+        inst = cls(data)
+
+        def jsonschema_validate(data=data):
+            try:
+                jsonschema.validate(data, SCHEMA)
+            except jsonschema.ValidationError:
+                pass
+
+        def set_leaf(inst=inst):
+            # NOTE: `bool` of an unchanged instance found valid validates nothing
+            inst.customer.name = "name"
+            return bool(inst)
+
+        print(f"--- {name}")
+        for case, f in [("jsonschema.validate", jsonschema_validate),
+                        ("validate(inst, full=True)", partial(validate, inst, full=True)),
+                        ("bool(inst), a leaf set", set_leaf),
+                        ("is_valid(inst)", partial(is_valid, inst)),
+                        ("errors(inst)", partial(errors, inst))]:
+            print(f"{case:>25}: {per_second(f, repeats):10.0f} validations/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
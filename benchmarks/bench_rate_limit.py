@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""
+RateLimitFilter per-record cost.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_rate_limit.py [records]
+"""
+
+import sys
+import logging
+from time import perf_counter
+
+from physocts import log
+
+
+def per_call(f, n):
+    """nanoseconds per call"""
+    t = perf_counter()
+    for _ in range(n):
+        f()
+    return (perf_counter() - t)/n*1e9
+
+
+def main(n=200000):
+    record = logging.LogRecord("soners", logging.WARNING, __file__, 1, "msg", None, None)
+
+    passing = log.RateLimitFilter(rate=1e12, burst=10**12)
+    dropping = log.RateLimitFilter(rate=1e-12, burst=1)
+    sampling = log.RateLimitFilter(debug_sample=100)
+    debug_record = logging.LogRecord("soners", logging.DEBUG, __file__, 1, "msg", None, None)
+
+    print(f"filter, passed:    {per_call(lambda: passing.filter(record), n):8.0f} ns/record")
+    print(f"filter, dropped:   {per_call(lambda: dropping.filter(record), n):8.0f} ns/record")
+    print(f"filter, sampled:   {per_call(lambda: sampling.filter(debug_record), n):8.0f} ns/record")
+
+    logger = log.get_logger()
+    log.clear_logger(logger)
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(logging.NullHandler())
+
+    print(f"LOG.warning, no filter:     {per_call(lambda: logger.warning('msg'), n):8.0f} ns/record")
+    logger.addFilter(dropping)
+    print(f"LOG.warning, dropped:       {per_call(lambda: logger.warning('msg'), n):8.0f} ns/record")
+    log.clear_logger(logger)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
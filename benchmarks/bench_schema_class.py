@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""
+Attribute reads and writes of a 3-level nested path with `SchemaClass`
+generated classes and with `DataMeta` types.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_schema_class.py [repeats]
+"""
+
+import sys
+from time import perf_counter
+
+from physocts.meta import DataMeta, SchemaClass
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "a": {
+            "type": "object",
+            "properties": {
+                "b": {
+                    "type": "object",
+                    "properties": {"c": {"type": "integer"}, "d": {"type": "string"}}}}}}}
+
+DATA = {"a": {"b": {"c": 1, "d": "d"}}}
+
+
+def per_second(f, repeats):
+    t = perf_counter()
+    for _ in range(repeats):
+        f()
+    return repeats/(perf_counter() - t)
+
+
+def main(repeats=200000):
+    for name, cls in [("SchemaClass", SchemaClass(SCHEMA)), ("DataMeta", DataMeta(SCHEMA))]:
+        inst = cls(DATA)
+        reads = per_second(lambda inst=inst: inst.a.b.c, repeats)
+
+        def write(inst=inst):
+            inst.a.b.c = 2
+
+        writes = per_second(write, repeats)
+        print(f"{name:>12}: reads {reads:10.0f}/s, writes {writes:10.0f}/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+`wrapper_with_log` cost per call with the logging level disabled and enabled,
+against a plain call and the original implementation.
+
+    $ PYTHONPATH=. python3 benchmarks/bench_wrapper_with_log.py [calls]
+"""
+
+import sys
+import logging
+from functools import wraps
+from time import perf_counter
+
+from physocts import log
+
+
+def legacy_wrapper_with_log(log_hlr, msg_prefix=None):
+    """`wrapper_with_log` as it was before the level check"""
+
+    def wrap_in_log(f):
+
+        @wraps(f)
+        def g(*a, **k):
+            res = f(*a, **k)
+            log_hlr(( msg_prefix + ": " if msg_prefix else "") + "%s", res)
+
+            return res
+
+        return g
+
+    return wrap_in_log
+
+
+RESULT = {str(i): list(range(10)) for i in range(1000)}
+
+
+def f():
+    return RESULT
+
+
+def per_call(g, n):
+    """nanoseconds per call"""
+    t = perf_counter()
+    for _ in range(n):
+        g()
+    return (perf_counter() - t)/n*1e9
+
+
+def main(n=100000):
+    logger = log.get_logger()
+    log.clear_logger(logger)
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.INFO)
+
+    legacy = legacy_wrapper_with_log(logger.debug, "f")(f)
+    lazy = log.wrapper_with_log(logger.debug, "f")(f)
+    summarized = log.wrapper_with_log(logger.info, "f", log.summary_size)(f)
+
+    print(f"plain call:                 {per_call(f, n):10.0f} ns")
+    print(f"legacy, DEBUG disabled:     {per_call(legacy, n):10.0f} ns")
+    print(f"lazy, DEBUG disabled:       {per_call(lazy, n):10.0f} ns")
+    print(f"summary_size, INFO enabled: {per_call(summarized, n):10.0f} ns")
+
+    log.clear_logger(logger)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
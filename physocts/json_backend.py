@@ -0,0 +1,278 @@
+"""
+file: json_backend.py
+author: Nikolay S. Vasil'ev
+description: JSON encoder and decoder backends used by `json_ext`
+
+The first installed backend of `PREFERRED_BACKENDS` is used unless
+the `PHYSOCTS_JSON_BACKEND` environment variable or `set_backend` choose
+another one.
+
+Every backend gives the same results as the standard `json` module: parsed
+values are equal and the same documents fail; encoding options a backend
+can not reproduce are handled by `json`.
+"""
+
+import os
+import json
+from enum import Enum
+from uuid import UUID
+from datetime import date, datetime
+from dataclasses import dataclass
+from typing import Callable, Any, Dict, IO, Optional
+
+BACKEND_ENV = "PHYSOCTS_JSON_BACKEND"
+
+
+@dataclass
+class Backend:
+    """JSON functions with the `json` module signatures"""
+    name: str
+    loads: Callable[..., Any]
+    dumps: Callable[..., str]
+    load: Callable[..., Any]
+    dump: Callable[..., None]
+
+
+STDLIB = Backend(
+    name="json",
+    loads=json.loads,
+    dumps=json.dumps,
+    load=json.load,
+    dump=json.dump)
+
+
+_ORJSON_ARGS = {"ensure_ascii", "sort_keys", "default", "indent", "separators"}
+_DIGITS_TO_NINES = bytes.maketrans(b"012345678", b"9"*9)
+
+
+def _has_long_number(s) -> bool:
+    """
+    Whether there are 19 digits in a row; `orjson` parses integers out of
+    the 64 bit range as floats
+    """
+    if isinstance(s, str):
+        s = s.encode("utf-8", "surrogatepass")
+    return b"9"*19 in s.translate(_DIGITS_TO_NINES)
+
+
+_INF = float("inf")
+_KEY_TYPES = {str, int, bool, type(None)}
+
+
+def _orjson_encodes(obj, str_keys: bool=False) -> bool:
+    """
+    Whether `orjson` encodes the object as `json` does: it writes NaN and
+    infinities as `null` and enums, UUIDs and dates in keys by value, where
+    `json` fails or calls `default`; other types are passed to `default`
+    with the passthrough options, see `_make_orjson_backend`.
+    Set `str_keys` for sorted keys: `orjson` sorts keys of mixed types, where
+    `json` fails.
+    """
+    # NOTE: a recursive walk with atoms checked in place is the fastest one
+    kind = type(obj)
+    if kind is dict:
+        for (key, value) in obj.items():
+            if type(key) is not str and (str_keys or not _is_key(key)):
+                return False
+            if type(value) not in _KEY_TYPES and not _orjson_encodes(value, str_keys):
+                return False
+        return True
+    if kind is list or kind is tuple:
+        for value in obj:
+            if type(value) not in _KEY_TYPES and not _orjson_encodes(value, str_keys):
+                return False
+        return True
+    if kind is float:
+        return -_INF < obj < _INF
+    return not isinstance(obj, (Enum, UUID))
+
+
+def _is_key(key) -> bool:
+    """Whether `json` and `orjson` encode the dictionary key alike"""
+    return type(key) in _KEY_TYPES or type(key) is float and -_INF < key < _INF
+
+
+def _encodes(obj, str_keys: bool) -> bool:
+    try:
+        return _orjson_encodes(obj, str_keys)
+    except RecursionError:
+        return False
+
+
+def _to_json(obj):
+    """`default` of `orjson`: objects it passes through are left to `json`"""
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _make_orjson_backend(orjson) -> Backend:
+    """
+    `orjson` decodes anything `json` does except NaN, infinities, big
+    integers and deep nesting; documents with 19+ digit numbers are passed to
+    `json`, others on failure.
+    It encodes the compact and 2-space indented formats only, with non ASCII
+    characters as is, otherwise `json` is used; `json` also encodes objects
+    with NaN, infinities, enums or UUIDs, and objects `orjson` passes to
+    `default`: dataclasses, dates, subclasses of the JSON types and the rest
+    of the types it does not know.
+    NOTE:
+        `orjson` writes floats in the shortest form (`1e16`, not `1e+16`).
+    """
+
+    def option(k: dict) -> Optional[int]:
+        """`orjson` options for `json` arguments or None if not supported"""
+        if k.get("ensure_ascii", True) or not k.keys() <= _ORJSON_ARGS:
+            return None
+
+        opt = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS | \
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS | \
+            (orjson.OPT_SORT_KEYS if k.get("sort_keys") else 0)
+        (indent, separators) = (k.get("indent"), k.get("separators"))
+
+        if indent is None and separators in [(",", ":"), [",", ":"]]:
+            return opt
+        if indent in [2, "  "] and separators is None:
+            return opt | orjson.OPT_INDENT_2
+        return None
+
+    def loads(s, **k):
+        if k or _has_long_number(s):
+            return json.loads(s, **k)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            return json.loads(s)
+
+    def dumps(obj, **k):
+        if (opt := option(k)) is not None and _encodes(obj, bool(k.get("sort_keys"))):
+            try:
+                return orjson.dumps(obj, default=_to_json, option=opt).decode()
+            except orjson.JSONEncodeError:
+                pass
+        return json.dumps(obj, **k)
+
+    def load(fid: IO, **k):
+        return loads(fid.read(), **k)
+
+    def dump(obj, fid: IO, **k):
+        if (opt := option(k)) is not None and _encodes(obj, bool(k.get("sort_keys"))):
+            try:
+                fid.write(orjson.dumps(obj, default=_to_json, option=opt).decode())
+                return
+            except orjson.JSONEncodeError:
+                pass
+        json.dump(obj, fid, **k)
+
+    return Backend(name="orjson", loads=loads, dumps=dumps, load=load, dump=dump)
+
+
+def _load_orjson() -> Optional[Backend]:
+    try:
+        import orjson  # pylint: disable=C0415
+    except ImportError:
+        return None
+    return _make_orjson_backend(orjson)
+
+
+# backend name -> backend loader, the fastest first
+PREFERRED_BACKENDS: Dict[str, Callable[[], Optional[Backend]]] = {
+    "orjson": _load_orjson,
+    "json": lambda: STDLIB}
+
+_BACKENDS: Dict[str, Backend] = {}
+
+
+def register_backend(backend: Backend):
+    """Make a backend available for `set_backend`"""
+    _BACKENDS[backend.name] = backend
+
+
+def available_backends() -> Dict[str, Backend]:
+    """Installed backends"""
+    for name, loader in PREFERRED_BACKENDS.items():
+        if name not in _BACKENDS and (backend := loader()) is not None:
+            register_backend(backend)
+    return dict(_BACKENDS)
+
+
+BACKEND: Backend = STDLIB
+
+
+def get_backend() -> Backend:
+    """The backend in use"""
+    return BACKEND
+
+
+def set_backend(name: Optional[str]=None) -> Backend:
+    """
+    Use the backend named, or the first installed one of `PREFERRED_BACKENDS`
+    """
+    global BACKEND  # pylint: disable=W0603
+
+    backends = available_backends()
+    if name is None:
+        name = next(name for name in PREFERRED_BACKENDS if name in backends)
+    if name not in backends:
+        raise KeyError(f"JSON backend `{name}` is not available, use one of: {list(backends)}")
+
+    BACKEND = backends[name]
+    return BACKEND
+
+
+set_backend(os.environ.get(BACKEND_ENV) or None)
+
+
+def test_backends_agree():
+    """all the backends parse and fail the same way as `json`"""
+
+    docs = ['{"a": [1, 2.5, "\\u00fc", null, true]}', '[NaN, 1e400]', str(2**70), '[1', '']
+    compact = {"separators": (",", ":"), "ensure_ascii": False}
+
+    for backend in available_backends().values():
+        for doc in docs:
+            try:
+                expected = repr(json.loads(doc))
+            except json.JSONDecodeError:
+                expected = "error"
+            try:
+                assert repr(backend.loads(doc)) == expected
+            except json.JSONDecodeError:
+                assert expected == "error"
+
+        assert json.loads(backend.dumps({"a": [1, "ü", 2**70]}, **compact)) == \
+            {"a": [1, "ü", 2**70]}
+        assert backend.dumps({"a": 1}) == '{"a": 1}'
+
+
+def test_backends_encode_alike():
+    """all the backends encode and fail the same way as `json`"""
+
+    @dataclass
+    class Point:
+        """a dataclass"""
+        x: int
+
+    class Color(Enum):
+        """an enum"""
+        RED = "red"
+
+    class Name(str):
+        """a subclass of `str`"""
+
+    objs = [Point(1), datetime(2000, 1, 2), UUID(int=1), [float("nan"), -float("inf")],
+            Color.RED, {Name("a"): Name("b")}, {date(2000, 1, 2): 1}, {1: 2, 1.5: None},
+            {"b": {1: 2, "a": 1}, "a": [{2: 1, 1: 2}]},
+            {"a": [1, 2.5, "ü", None, True, (3, )]}]
+    compact = {"separators": (",", ":"), "ensure_ascii": False}
+    options = [compact, {**compact, "default": repr}, {**compact, "sort_keys": True},
+               {"indent": 2, "ensure_ascii": False}]
+
+    def encode(f, obj, **k) -> str:
+        try:
+            return f(obj, **k)
+        except (TypeError, ValueError):
+            return "error"
+
+    for backend in available_backends().values():
+        for obj in objs:
+            for k in options:
+                assert encode(backend.dumps, obj, **k) == encode(json.dumps, obj, **k)
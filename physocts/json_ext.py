@@ -4,19 +4,86 @@ author: Nikolay S. Vasil'ev
 description: handle JSON structures
 """
 
+import io
+import os
+import re
+import bz2
+import gzip
+import lzma
 import json
-from typing import Callable, Tuple, Union, Optional
+import atexit
+from time import monotonic
+from threading import Lock, Condition, Thread, get_ident
+from types import MappingProxyType, ModuleType
+from collections import OrderedDict
+from itertools import chain
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Callable, Tuple, Union, Optional, Iterable, Iterator, Any, List, Sequence, IO, Dict
 from functools import partial
 from pathlib import Path
 
 from physocts.wrappers import wrap_in_either
+from physocts import json_backend
 
-from .log import force_stderr_log
+from .log import force_stderr_log, get_logger
 from .either import Either, EitherType
 from .exceptions import report_traceback
 
+LOG = get_logger()
+
 FileNameType = Union[str, Path]
 
+WRITE_BUFFER_SIZE = 1024*1024
+READ_CHUNK_SIZE = 1024*1024
+CACHE_MAX_SIZE = 64*1024*1024
+LOAD_MANY_MAX_CHUNK = 256
+STATE_WRITE_DELAY = 0.5
+INFO_MAX_BYTES = 1024*1024
+INFO_CHUNK_SIZE = 64*1024
+
+COMPRESSION_EXTENSIONS = {".gz": gzip, ".bz2": bz2, ".xz": lzma, ".lzma": lzma}
+COMPRESSION_MAGIC = {b"\x1f\x8b": gzip, b"BZh": bz2, b"\xfd7zXZ\x00": lzma}
+# errors of reading a truncated or corrupt (compressed) file
+_READ_ERRORS = (OSError, EOFError, lzma.LZMAError)
+
+
+def _compression(flnm: FileNameType, fid: Optional[io.BufferedReader]=None) -> Optional[ModuleType]:
+    """Compression module by the file extension or the magic bytes"""
+    if (module := COMPRESSION_EXTENSIONS.get(Path(flnm).suffix.lower())) is not None:
+        return module
+    if fid is None:
+        return None
+    head = fid.peek(6)[:6]
+    return next((module for magic, module in COMPRESSION_MAGIC.items()
+                 if head.startswith(magic)), None)
+
+
+def open_file(
+        flnm: FileNameType,
+        mode: str='r',
+        compresslevel: Optional[int]=None,
+        buffering: int=-1) -> IO:
+    """
+    Open a file as `open` does, in UTF-8 for the text mode; gzip, bzip2 and
+    xz files are (de)compressed on the fly, they are detected by the file
+    extension and, when reading, by the magic bytes.
+    `compresslevel` is the compression level or the xz preset.
+    """
+    encoding = None if "b" in mode else "utf-8"
+
+    if (module := _compression(flnm)) is None and mode[0] == 'r':
+        fid = open(flnm, 'rb', buffering=buffering)  # pylint: disable=R1732
+        if (module := _compression(flnm, fid)) is None:
+            return fid if encoding is None else io.TextIOWrapper(fid, encoding=encoding)
+        fid.close()
+
+    if module is None:
+        return open(flnm, mode, encoding=encoding, buffering=buffering)  # pylint: disable=R1732
+
+    level = {} if compresslevel is None or mode[0] == 'r' else \
+        {"preset": compresslevel} if module is lzma else {"compresslevel": compresslevel}
+    return module.open(flnm, mode if encoding is None else mode + "t", encoding=encoding, **level)
+
 
 def try_loads(s: str) -> Optional[dict]:
     """
@@ -24,36 +91,730 @@ def try_loads(s: str) -> Optional[dict]:
     otherwise
     """
     try:
-        return json.loads(s)
+        return json_backend.BACKEND.loads(s)
     except json.JSONDecodeError:
         return None
 
-def unsafe_write(data: dict, flnm: FileNameType, **k):
-    with open(flnm, 'w', encoding="utf-8") as fid:
-        json.dump(data, fid, **k)
+def unsafe_write(data: dict, flnm: FileNameType, compresslevel: Optional[int]=None, **k):
+    with open_file(flnm, 'w', compresslevel) as fid:
+        json_backend.BACKEND.dump(data, fid, **k)
 
 write = wrap_in_either(unsafe_write)
 
 
 def unsafe_load(flnm: FileNameType, **k) -> dict:
-    with open(flnm, 'r', encoding="utf-8") as fid:
-        return json.load(fid, **k)
+    with open_file(flnm, 'r') as fid:
+        return json_backend.BACKEND.load(fid, **k)
 
 load = wrap_in_either(unsafe_load)
 
 
+def _unsafe_replace(text: str, flnm: FileNameType, compresslevel: Optional[int]=None):
+    """
+    Write a temporary file next to `flnm` and rename it over `flnm`, readers
+    see either the old or the new content
+    """
+    path = Path(flnm)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{get_ident()}.tmp{path.suffix}")
+    try:
+        with open_file(tmp, 'w', compresslevel) as fid:
+            fid.write(text)
+        fd = os.open(tmp, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def unsafe_write_atomic(data: Any, flnm: FileNameType, compresslevel: Optional[int]=None, **k):
+    """Write JSON data replacing the file atomically"""
+    _unsafe_replace(dumps(data, **k), flnm, compresslevel)
+
+write_atomic = wrap_in_either(unsafe_write_atomic)
+
+
+class JsonStateWriter:
+    """
+    Write-behind writer of JSON state files: updates of a file within `delay`
+    seconds since the first one are merged into a single write, which is made
+    by a background thread with `write_atomic`.
+    Pending states are written by `flush`, `close` and at exit.
+    NOTE:
+        data is serialized when written, not when updated, and it is not
+        copied: pass an immutable value or a new object per update, which
+        is not changed afterwards.
+    """
+
+    def __init__(self, delay: float=STATE_WRITE_DELAY, compresslevel: Optional[int]=None, **k):
+        self.delay = delay
+        self.compresslevel = compresslevel
+        self.k = k
+
+        # file name -> (write deadline, data)
+        self._pending: Dict[str, Tuple[float, Any]] = {}
+        self._writing = False
+        self._closed = False
+        self._cond = Condition()
+
+        self._thread = Thread(target=self._run, name="JsonStateWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def update(self, flnm: FileNameType, data: Any):
+        """Schedule writing the data to the file"""
+        key = os.fspath(flnm)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The state writer is closed")
+            deadline = self._pending[key][0] if key in self._pending else monotonic() + self.delay
+            self._pending[key] = (deadline, data)
+            self._cond.notify_all()
+
+    def flush(self):
+        """Write all the pending states and wait for them to be written"""
+        with self._cond:
+            self._pending = {key: (0.0, data) for key, (_, data) in self._pending.items()}
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not (self._pending or self._writing))
+
+    def close(self):
+        """Write all the pending states and stop the writer thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _due(self) -> Dict[str, Any]:
+        """Wait for the states to be written, empty when closed and nothing to write"""
+        with self._cond:
+            while True:
+                now = monotonic()
+                if due := [key for key, (deadline, _) in self._pending.items()
+                           if deadline <= now or self._closed]:
+                    self._writing = True
+                    return {key: self._pending.pop(key)[1] for key in due}
+                if self._closed:
+                    return {}
+                self._cond.wait(min((deadline for (deadline, _) in self._pending.values()),
+                                    default=now + 3600) - now)
+
+    def _write(self, flnm: str, data: Any):
+        _unsafe_replace(dumps(data, **self.k), flnm, self.compresslevel)
+
+    def _run(self):
+        while due := self._due():
+            for flnm, data in due.items():
+                if not (res := wrap_in_either(self._write)(flnm, data)):
+                    LOG.error("Failed to write the state file %s:\n%s", flnm, res.value)
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+def freeze(data: Any) -> Any:
+    """Read-only copy of JSON data: dictionaries become mapping proxies and
+    lists become tuples"""
+    if isinstance(data, dict):
+        return MappingProxyType({key: freeze(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return tuple(freeze(value) for value in data)
+    return data
+
+
+class JsonCache:
+    """
+    LRU cache of parsed JSON files; a file is parsed again once its
+    modification time or size changes, so a hit costs a single `stat` call.
+
+    The cache size is the total length of the cached JSON texts, decompressed,
+    as an estimate of the parsed values size; it is limited with `max_size`
+    characters. Cached values are shared, set `readonly` to get them frozen,
+    see `freeze`.
+    """
+    def __init__(self, max_size: Optional[int]=None, readonly: bool=False):
+        self.max_size = max_size or CACHE_MAX_SIZE
+        self.readonly = readonly
+        self.hits = 0
+        self.misses = 0
+
+        # (device, inode) -> (mtime, file size, text length, value)
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+        self.load = wrap_in_either(self.unsafe_load)
+
+    def unsafe_load(self, flnm: FileNameType) -> Any:
+        stat = os.stat(flnm)
+        key = (stat.st_dev, stat.st_ino)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[3]
+            self.misses += 1
+
+        with open_file(flnm, 'r') as fid:
+            text = fid.read()
+        value = json_backend.BACKEND.loads(text)
+        if self.readonly:
+            value = freeze(value)
+
+        with self._lock:
+            if (old := self._entries.pop(key, None)) is not None:
+                self._size -= old[2]
+            if len(text) <= self.max_size:
+                self._entries[key] = (stat.st_mtime_ns, stat.st_size, len(text), value)
+                self._size += len(text)
+            while self._size > self.max_size:
+                self._size -= self._entries.popitem(last=False)[1][2]
+
+        return value
+
+    def stats(self) -> dict:
+        """Hit and miss counters and the cache size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "size": self._size,
+            "max_size": self.max_size}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_CACHE = JsonCache()
+
+load_cached: Callable[[FileNameType], EitherType[Any]]
+load_cached = _CACHE.load
+cache_stats = _CACHE.stats
+cache_clear = _CACHE.clear
+
+
+def iter_load_lines(flnm: FileNameType, **k) -> Iterator[EitherType[Any]]:
+    """
+    Iterate over a JSON-lines file; yields a Right instance with a parsed line
+    or a Left instance with the line number and the error report, so a broken
+    line does not stop the iteration, a failed read does; empty lines are
+    skipped
+    """
+    # NOTE: lines are decoded by the wrapped loads, so a line that is not valid
+    # UTF-8 is reported as any other broken line
+    loads = wrap_in_either(lambda line: json_backend.BACKEND.loads(line.decode("utf-8"), **k))
+
+    try:
+        fid = open_file(flnm, 'rb')
+    except OSError:
+        yield Either.left(report_traceback())
+        return
+
+    with fid:
+        line_no = 0
+        while True:
+            try:
+                line = fid.readline()
+            except _READ_ERRORS:
+                yield Either.left(f"line {line_no + 1}:\n{report_traceback()}")
+                return
+            if not line:
+                return
+            line_no += 1
+            if not line.strip():
+                continue
+            if not (res := loads(line)):
+                res = Either.left(f"line {line_no}:\n{res.value}")
+            yield res
+
+
+def _unsafe_write_lines(
+        data: Iterable[Any],
+        flnm: FileNameType,
+        mode: str,
+        compresslevel: Optional[int]=None,
+        **k) -> int:
+    k = {"separators": (",", ":"), **k}
+    line_no = 0
+    with open_file(flnm, mode, compresslevel, buffering=WRITE_BUFFER_SIZE) as fid:
+        for line_no, item in enumerate(data, 1):
+            try:
+                line = json_backend.BACKEND.dumps(item, **k)
+            except (TypeError, ValueError) as err:
+                raise ValueError(f"Failed to dump line {line_no}: {err}") from err
+            fid.write(line + "\n")
+    return line_no
+
+
+def unsafe_write_lines(
+        data: Iterable[Any],
+        flnm: FileNameType,
+        compresslevel: Optional[int]=None,
+        **k) -> int:
+    """Write items as JSON lines, returns the number of lines written"""
+    return _unsafe_write_lines(data, flnm, 'w', compresslevel, **k)
+
+write_lines = wrap_in_either(unsafe_write_lines)
+
+
+def unsafe_append_lines(
+        data: Iterable[Any],
+        flnm: FileNameType,
+        compresslevel: Optional[int]=None,
+        **k) -> int:
+    """Append items as JSON lines, returns the number of lines written"""
+    return _unsafe_write_lines(data, flnm, 'a', compresslevel, **k)
+
+append_lines = wrap_in_either(unsafe_append_lines)
+
+
+def dumps(data: Any, **k) -> str:
+    """`json.dumps` with the current backend, see `json_backend`"""
+    return json_backend.BACKEND.dumps(data, **k)
+
+
+# strings, incomplete strings and structural characters
+_ARRAY_TOKENS = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|"|[\[\]{},]', re.S)
+# a string part up to the closing quote or an incomplete escape at the end
+_STRING_PART = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+
+
+def iter_array(flnm: FileNameType, **k) -> Iterator[EitherType[Any]]:
+    """
+    Iterate over elements of a file with a JSON array, reading it by chunks;
+    only the element being parsed is kept in memory.
+
+    Yields a Right instance with a parsed element or a Left instance with
+    the element byte offset and the error report; a malformed element
+    does not stop the iteration, a broken array structure or a failed read
+    does.
+    """
+    loads = wrap_in_either(partial(json_backend.BACKEND.loads, **k))
+
+    try:
+        fid = open_file(flnm, 'rb')
+    except OSError:
+        yield Either.left(report_traceback())
+        return
+
+    def element(buf: bytearray, start: int, end: int, base: int) -> EitherType[Any]:
+        text = bytes(buf[start:end])
+        offset = base + start + len(text) - len(text.lstrip())
+        if not (res := loads(text)):
+            return Either.left(f"byte {offset}:\n{res.value}")
+        return res
+
+    with fid:
+        (buf, base, pos, eof) = (bytearray(), 0, 0, False)
+        (start, depth, count, in_string) = (None, 0, 0, False)
+
+        while True:
+            # NOTE: a string split by chunks is scanned once, from where the
+            # previous chunk ended
+            if in_string:
+                pos = _STRING_PART.match(buf, pos).end()
+                if b_more := pos == len(buf) or buf[pos] != ord('"'):
+                    tkn = None
+                else:
+                    (pos, in_string) = (pos + 1, False)
+                    continue
+            else:
+                tkn = _ARRAY_TOKENS.search(buf, pos)
+                b_more = tkn is None or (tkn.group() == b'"' and start is not None)
+
+            # need more data
+            if b_more:
+                if eof:
+                    yield Either.left(f"byte {base + len(buf)}: unexpected end of the array")
+                    return
+                if tkn is not None:
+                    (pos, in_string) = (tkn.end(), True)
+                elif not in_string:
+                    pos = len(buf)
+                if start:
+                    del buf[:start]
+                    (base, pos, start) = (base + start, pos - start, 0)
+                try:
+                    chunk = fid.read(READ_CHUNK_SIZE)
+                except _READ_ERRORS:
+                    yield Either.left(f"byte {base + len(buf)}:\n{report_traceback()}")
+                    return
+                eof = not chunk
+                buf += chunk
+                continue
+
+            pos = tkn.end()
+            sym = tkn.group()
+
+            if start is None:
+                if sym != b"[" or buf[:tkn.start()].strip(b" \t\r\n\xef\xbb\xbf"):
+                    yield Either.left(f"byte {base + tkn.start()}: not a JSON array")
+                    return
+                start = pos
+            elif sym[0] == ord('"'):
+                continue
+            elif sym in (b"[", b"{"):
+                depth += 1
+            elif depth:
+                if sym in (b"]", b"}"):
+                    depth -= 1
+            elif sym == b",":
+                yield element(buf, start, tkn.start(), base)
+                (start, count) = (pos, count + 1)
+            elif sym == b"]":
+                if count or buf[start:tkn.start()].strip():
+                    yield element(buf, start, tkn.start(), base)
+                return
+            else:
+                yield Either.left(f"byte {base + tkn.start()}: unexpected `}}`")
+                return
+
+
+def _load_chunk(flnms: Sequence[FileNameType]) -> List[EitherType[Any]]:
+    return [load(flnm) for flnm in flnms]
+
+
+def _chunks(flnms: Sequence[FileNameType], workers: int) -> List[Sequence[FileNameType]]:
+    # a few chunks per worker to balance the load, but not too many to keep
+    # pickling and scheduling costs low
+    size = max(1, min(LOAD_MANY_MAX_CHUNK, -(-len(flnms)//(workers*4))))
+    return [flnms[i:i + size] for i in range(0, len(flnms), size)]
+
+
+def _executor(mode: str, workers: int) -> Executor:
+    executors = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+    if mode not in executors:
+        raise ValueError(f"Unknown mode: {mode!r}, use one of: {list(executors)}")
+    return executors[mode](max_workers=workers)
+
+
+def load_many(
+        flnms: Iterable[FileNameType],
+        workers: Optional[int]=None,
+        mode: str="thread") -> List[EitherType[Any]]:
+    """
+    Load many files in parallel with `workers` threads or processes;
+    returns an Either instance per file in the order given
+    """
+    flnms = list(flnms)
+    workers = workers or os.cpu_count() or 1
+
+    with _executor(mode, workers) as executor:
+        return list(chain.from_iterable(executor.map(_load_chunk, _chunks(flnms, workers))))
+
+
+def iter_load_many(
+        flnms: Iterable[FileNameType],
+        workers: Optional[int]=None,
+        mode: str="thread") -> Iterator[Tuple[FileNameType, EitherType[Any]]]:
+    """
+    Load many files in parallel with `workers` threads or processes;
+    yields file names with Either instances as soon as they are loaded
+    """
+    flnms = list(flnms)
+    workers = workers or os.cpu_count() or 1
+
+    with _executor(mode, workers) as executor:
+        futures = {executor.submit(_load_chunk, chunk): chunk
+                   for chunk in _chunks(flnms, workers)}
+        try:
+            for ftr in as_completed(futures):
+                yield from zip(futures[ftr], ftr.result())
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
 flat: Callable[[dict], EitherType[str]]
-flat = wrap_in_either(json.dumps)
+flat = wrap_in_either(dumps)
+
+
+def _pretty_key(key: Any) -> str:
+    """a dictionary key as `json` writes it"""
+    if isinstance(key, str):
+        return json.dumps(key)
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(json.dumps(key) if not isinstance(key, float) else repr(key))
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def _iter_pretty(
+        data: Any,
+        pad: str,
+        depth: Optional[int],
+        width: Optional[int],
+        max_str: Optional[int]) -> Iterator[str]:
 
+    if isinstance(data, dict):
+        (items, opening, closing) = (data.items(), "{", "}")
+    elif isinstance(data, (list, tuple)):
+        (items, opening, closing) = (data, "[", "]")
+    else:
+        if max_str is not None and isinstance(data, str):
+            data = data[:max_str]
+        yield json.dumps(data)
+        return
 
-pretty: Callable[[dict], EitherType[str]]
-pretty = wrap_in_either(partial(json.dumps, indent=" "*4))
+    if not data:
+        yield opening + closing
+        return
+    if depth == 0:
+        yield json.dumps(f"... {len(data)} items")
+        return
 
+    inner = pad + " "*4
+    yield opening
+    for (i, item) in enumerate(items):
+        yield ",\n" + inner if i else "\n" + inner
+        if width is not None and i == width:
+            more = f"{len(data) - width} more items"
+            yield f'"...": "{more}"' if closing == "}" else f'"... {more}"'
+            break
+        if closing == "}":
+            yield _pretty_key(item[0]) + ": "
+            item = item[1]
+        yield from _iter_pretty(item, inner, None if depth is None else depth - 1, width, max_str)
+    yield "\n" + pad + closing
 
-def info(data: dict):
+
+def iter_pretty(
+        data: Any,
+        max_bytes: Optional[int]=None,
+        max_depth: Optional[int]=None,
+        max_width: Optional[int]=None) -> Iterator[str]:
+    """
+    Pretty JSON string of the data in parts; containers deeper than
+    `max_depth` and items after `max_width` ones are replaced with
+    "... N items" strings, the output is cut at `max_bytes` bytes
+    """
+    size = 0
+    for part in _iter_pretty(data, "", max_depth, max_width, max_bytes):
+        size += len(part) if part.isascii() else len(part.encode("utf-8"))
+        if max_bytes is not None and size > max_bytes:
+            rest = len(part) - (size - max_bytes) if part.isascii() else \
+                len(part.encode("utf-8")[:max_bytes - size].decode("utf-8", "ignore"))
+            yield part[:rest] + f"\n... truncated at {max_bytes} bytes"
+            return
+        yield part
+
+
+def unsafe_pretty(
+        data: Any,
+        max_bytes: Optional[int]=None,
+        max_depth: Optional[int]=None,
+        max_width: Optional[int]=None,
+        **k) -> str:
+    """
+    Pretty JSON string, see `iter_pretty` for the limits; `k` are passed to
+    `dumps`, they are not supported with the limits
+    """
+    if max_bytes is None and max_depth is None and max_width is None:
+        return dumps(data, **{"indent": " "*4, **k})
+    if k:
+        raise TypeError(f"Unsupported arguments with the limits: {sorted(k)}")
+    return "".join(iter_pretty(data, max_bytes, max_depth, max_width))
+
+pretty: Callable[..., EitherType[str]]
+pretty = wrap_in_either(unsafe_pretty)
+
+
+def info(
+        data: Any,
+        max_bytes: Optional[int]=INFO_MAX_BYTES,
+        max_depth: Optional[int]=None,
+        max_width: Optional[int]=None):
+    """
+    Log the pretty JSON string of the data, see `iter_pretty` for the limits;
+    the string is logged in records of about `INFO_CHUNK_SIZE` characters
+    split at line ends
+    """
     with force_stderr_log(1) as l:
-        if not (res := pretty(data)):
-            l.error("Failed to dump to JSON string:\n%r", res.value)
+        (parts, size, prefix) = ([], 0, "JSON=\n")
+        try:
+            for part in iter_pretty(data, max_bytes, max_depth, max_width):
+                parts.append(part)
+                if (size := size + len(part)) < INFO_CHUNK_SIZE:
+                    continue
+                (text, sep, rest) = "".join(parts).rpartition("\n")
+                if sep:
+                    l.info(prefix + text)
+                    (parts, size, prefix) = ([rest], len(rest), "JSON (continued)=\n")
+        except Exception:  # pylint: disable=W0703
+            l.error("Failed to dump to JSON string:\n%r", report_traceback())
             return
 
-        l.info("JSON=\n" + res.value)
+        l.info(prefix + "".join(parts))
+
+
+def test_json_lines(tmp_path):
+    """testing JSON-lines writing and reading"""
+
+    flnm = tmp_path/"data.jsonl"
+
+    assert write_lines(({"i": i} for i in range(2)), flnm) == Either.right(2)
+    assert not append_lines([{"i": 2}, {3}], flnm)
+    with open(flnm, 'ab') as fid:
+        fid.write(b'{\n\n[4]\n"\xff"\n["\xc3\xbc"]\n')
+
+    res = list(iter_load_lines(flnm))
+    assert [r.value for r in res if r] == [{"i": 0}, {"i": 1}, {"i": 2}, [4], ["ü"]]
+    assert [r.value.split("\n")[0] for r in res if not r] == ["line 4:", "line 7:"]
+
+
+def test_iter_array(tmp_path):
+    """testing the streaming array parser"""
+
+    flnm = tmp_path/"data.json"
+    flnm.write_text('[1, "a,]\\"", {"b": [{"c": "}"}]}, {bad}, []]', encoding="utf-8")
+
+    res = list(iter_array(flnm))
+    assert [r.value for r in res if r] == [1, 'a,]"', {"b": [{"c": "}"}]}, []]
+    assert [r.value.split("\n")[0] for r in res if not r] == ["byte 34:"]
+
+
+def test_iter_array_chunks(tmp_path, monkeypatch):
+    """testing the streaming array parser with elements split by chunks"""
+
+    data = [1, 'a\\"b\\', {"x": ["]", "\\"]}, "ü" * 5, [], {}, '\\\\\\"' * 7]
+    flnm = tmp_path/"data.json"
+    flnm.write_text(json.dumps(data), encoding="utf-8")
+
+    for size in [1, 2, 3, 5]:
+        monkeypatch.setitem(globals(), "READ_CHUNK_SIZE", size)
+        assert [r.value for r in iter_array(flnm)] == data
+
+
+def test_load_many(tmp_path):
+    """testing the parallel loading"""
+
+    flnms = [tmp_path/f"{i}.json" for i in range(7)]
+    for (i, flnm) in enumerate(flnms):
+        flnm.write_text(json.dumps({"i": i}), encoding="utf-8")
+    flnms[3] = tmp_path/"none.json"
+
+    for mode in ["thread", "process"]:
+        res = load_many(flnms, workers=2, mode=mode)
+        assert [r.value["i"] if r else None for r in res] == [0, 1, 2, None, 4, 5, 6]
+
+        res = dict(iter_load_many(flnms, workers=2, mode=mode))
+        assert sorted(res) == sorted(flnms)
+        assert not res[flnms[3]] and res[flnms[6]] == Either.right({"i": 6})
+
+    try:
+        load_many(flnms, mode="fiber")
+        assert False, "unknown mode accepted"
+    except ValueError:
+        pass
+
+
+def test_json_cache(tmp_path):
+    """testing the cached loading"""
+
+    flnm = tmp_path/"data.json"
+    flnm.write_text('{"a": [1]}', encoding="utf-8")
+
+    cache = JsonCache(readonly=True)
+    assert cache.load(flnm) == Either.right({"a": (1, )})
+    assert cache.load(flnm).value is cache.load(flnm).value
+
+    flnm.write_text('{"a": [1, 2]}', encoding="utf-8")
+    assert cache.load(flnm) == Either.right({"a": (1, 2)})
+    assert not cache.load(tmp_path/"none.json")
+
+    assert cache.stats() == {"hits": 2, "misses": 2, "entries": 1, "size": 13,
+                             "max_size": CACHE_MAX_SIZE}
+
+    # compressed files are counted by the decompressed text length
+    cache = JsonCache(max_size=30000)
+    for name in ["a.json.xz", "b.json.xz"]:
+        assert write([0]*10000, tmp_path/name, separators=(",", ":"))
+        assert (tmp_path/name).stat().st_size < 1000
+        assert cache.load(tmp_path/name) == Either.right([0]*10000)
+        assert (cache.stats()["entries"], cache.stats()["size"]) == (1, 20001)
+
+
+def test_compressed_files(tmp_path):
+    """testing the transparent compression"""
+
+    for ext in [".gz", ".bz2", ".xz"]:
+        flnm = tmp_path/("data.json" + ext)
+        assert write({"a": ["ü"]}, flnm, compresslevel=1)
+        assert load(flnm) == Either.right({"a": ["ü"]})
+        assert flnm.read_bytes()[:2] != b'{"'
+
+        renamed = flnm.rename(tmp_path/"data")
+        assert load(renamed) == Either.right({"a": ["ü"]})
+
+        assert write_lines([1, [2]], flnm) == Either.right(2)
+        assert [r.value for r in iter_load_lines(flnm)] == [1, [2]]
+
+
+def test_truncated_files(tmp_path):
+    """testing reading of truncated compressed files"""
+
+    for ext in [".gz", ".bz2", ".xz"]:
+        flnm = tmp_path/("data.jsonl" + ext)
+        assert write_lines([[i]*64 for i in range(256)], flnm) == Either.right(256)
+        flnm.write_bytes(flnm.read_bytes()[:-64])
+
+        res = list(iter_load_lines(flnm))
+        assert all(res[:-1]) and not res[-1]
+        assert res[-1].value.startswith(f"line {len(res)}:\n")
+        assert "EOFError" in res[-1].value
+
+        flnm = tmp_path/("data.json" + ext)
+        assert write(list(range(4096)), flnm)
+        flnm.write_bytes(flnm.read_bytes()[:-16])
+
+        res = list(iter_array(flnm))
+        assert all(res[:-1]) and not res[-1]
+        assert res[-1].value.startswith("byte 0:\n")
+        assert "EOFError" in res[-1].value
+
+
+def test_json_state_writer(tmp_path):
+    """testing the write-behind state writer"""
+
+    flnm = tmp_path/"state.json"
+    writer = JsonStateWriter(delay=60)
+
+    for i in range(3):
+        writer.update(flnm, {"i": i})
+    assert not flnm.exists()
+
+    writer.flush()
+    assert load(flnm) == Either.right({"i": 2})
+
+    writer.update(flnm, [1])
+    writer.close()
+    assert load(flnm) == Either.right([1])
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+def test_pretty_limits():
+    """testing the size-bounded pretty strings"""
+
+    data = {"a": [1, 2, 3, {"b": {"c": []}}], 1: "ü" * 10, None: {}}
+    assert pretty(data) == Either.right(json.dumps(data, indent=4))
+    assert "".join(iter_pretty(data)) == json.dumps(data, indent=4)
+    assert pretty({"b": 1, "a": 2}, sort_keys=True) == \
+        Either.right(json.dumps({"a": 2, "b": 1}, indent=4))
+    assert not pretty(data, max_depth=1, sort_keys=True)
+
+    assert json.loads(pretty(data, max_depth=2, max_width=2).value) == \
+        {"a": [1, 2, "... 2 more items"], "1": "ü" * 10, "...": "1 more items"}
+    assert json.loads(pretty(data, max_depth=1).value) == \
+        {"a": "... 4 items", "1": "ü" * 10, "null": {}}
+
+    res = pretty(data, max_bytes=20).value
+    assert res.startswith(json.dumps(data, indent=4)[:20])
+    assert res.endswith("\n... truncated at 20 bytes")
@@ -10,31 +10,79 @@ and stdout for info and higher:
 >>> enable_stdout(logging.INFO)
 >>> log.setLevel(logging.INFO)
 
+Pass `async_=True` to move formatting and writing to a background thread,
+see `AsyncHandler`:
+
+>>> enable_rotating_file(async_=True)
+
 """
 import os
 import sys
+import copy
+import reprlib
+from collections import deque
+from math import modf
+from time import perf_counter
+from enum import Enum
+from queue import Queue, Full, Empty
 from functools import partial, wraps
-from logging import getLogger, Logger, Filterer, Formatter, Handler
-from logging import WARNING
+from logging import getLogger, Logger, Filter, Filterer, Formatter, Handler, LogRecord
+from logging import DEBUG, WARNING, ERROR
 from logging import handlers, StreamHandler
+from threading import Timer, Event, local
+from weakref import WeakSet
 from datetime import datetime as dt
 from pathlib import Path
 from contextlib import contextmanager
-from typing import Optional, Callable, Union
+from contextvars import ContextVar
+from typing import Optional, Callable, Union, Any, List, Tuple
 
 from physocts.func import apply_item
 
 DEFAULT_LOGGER_LEVEL = 30
 DEFAULT_LOG_FILE_NAME = "log.log"
+DEFAULT_JSONL_FILE_NAME = "log.jsonl"
 DEFAULT_LOGGER_NAME = "soners"
 ROTATING_FILE_MAX_SIZE_MB = 1
 BACKUP_COUNT = 5
+ASYNC_QUEUE_SIZE = 10000
+WRITE_BUFFER_SIZE = 64*1024
+WRITE_BUFFER_INTERVAL = 1.0
+RATE_LIMIT_RATE = 10.0
+RATE_LIMIT_BURST = 20
+RING_BUFFER_SIZE = 1000
+
+# (level, handlers) overriding the default logger ones in the current context
+_LOG_OVERRIDE: ContextVar[Optional[Tuple[Optional[int], Optional[List[Handler]]]]]
+_LOG_OVERRIDE = ContextVar("soners_log_override", default=None)
+
+
+class ContextLogger(Logger):
+    """A logger which level and handlers may be overridden for the current
+    thread or asyncio task only, see `override_log`
+    """
+    def isEnabledFor(self, level: int) -> bool:
+        if (ovr := _LOG_OVERRIDE.get()) is None or ovr[0] is None:
+            return super().isEnabledFor(level)
+        return not self.disabled and level > self.manager.disable and level >= ovr[0]
+
+    def callHandlers(self, record: LogRecord):
+        if (ovr := _LOG_OVERRIDE.get()) is None or ovr[1] is None:
+            super().callHandlers(record)
+            return
+        for hlr in ovr[1]:
+            if record.levelno >= hlr.level:
+                hlr.handle(record)
+
 
 def get_logger() -> Logger:
     """Returns a default logger"""
     return getLogger(DEFAULT_LOGGER_NAME)
 
 
+get_logger().__class__ = ContextLogger
+
+
 def clear_logger(l: Optional[Logger] = None) -> dict:
     """
     Removes all handlers and filters from the logger;
@@ -46,6 +94,81 @@ def clear_logger(l: Optional[Logger] = None) -> dict:
             "filters": [apply_item(Filterer.removeFilter, l, f) for f in list(l.filters)]}
 
 
+#
+#   Filters
+#
+
+class RateLimitFilter(Filter):
+    """Limits the number of records logged from the same place.
+
+    Every call site, (module, line, level), has a token bucket of `burst`
+    records refilled with `rate` records per second; records are dropped while
+    the bucket is empty. DEBUG records are sampled instead if `debug_sample`
+    is greater than 1: only every `debug_sample`-th one is passed.
+
+    The number of records dropped since the last passed one is appended to the
+    message of the next passed record and stored in its `suppressed` attribute.
+
+    NOTE: the buckets are not locked, concurrent records from the same call
+    site make limits approximate.
+    """
+    def __init__(
+            self,
+            rate: Optional[float]=None,
+            burst: Optional[int]=None,
+            debug_sample: Optional[int]=None):
+
+        super().__init__()
+
+        self.rate = rate or RATE_LIMIT_RATE
+        self.burst = burst or RATE_LIMIT_BURST
+        self.debug_sample = debug_sample or 1
+
+        # call site -> [tokens, last record time, suppressed, counter]
+        self._sites = {}
+
+    def filter(self, record: LogRecord) -> bool:
+        key = (record.module, record.lineno, record.levelno)
+        if (site := self._sites.get(key)) is None:
+            site = self._sites[key] = [self.burst, record.created, 0, 0]
+
+        if record.levelno <= DEBUG and self.debug_sample > 1:
+            site[3] += 1
+            if site[3] % self.debug_sample != 1:
+                site[2] += 1
+                return False
+        else:
+            tokens = site[0] + (record.created - site[1])*self.rate
+            if tokens > self.burst:
+                tokens = self.burst
+            site[1] = record.created
+            if tokens < 1:
+                site[0] = tokens
+                site[2] += 1
+                return False
+            site[0] = tokens - 1
+
+        if site[2]:
+            record.suppressed = site[2]
+            record.msg = f"{record.getMessage()} [{site[2]} similar records suppressed]"
+            record.args = None
+            site[2] = 0
+
+        return True
+
+
+def enable_rate_limit(
+        rate: Optional[float]=None,
+        burst: Optional[int]=None,
+        debug_sample: Optional[int]=None) -> RateLimitFilter:
+    """
+    Install `RateLimitFilter` on the default logger
+    """
+    fltr = RateLimitFilter(rate, burst, debug_sample)
+    get_logger().addFilter(fltr)
+    return fltr
+
+
 #
 #   Formatters
 #
@@ -58,63 +181,123 @@ class FileLogFormatter(Formatter):
                              "\t%(message)s\n---")
 
 
+class JsonLinesFormatter(Formatter):
+    """Formats a record as a compact single line JSON object"""
+    def __init__(self):
+        # NOTE: `json_ext` imports this module
+        from physocts import json_ext  # pylint: disable=C0415
+
+        self._flat = partial(json_ext.flat, separators=(",", ":"), ensure_ascii=False, default=repr)
+
+        super().__init__()
+
+    def format(self, record):
+        data = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "thread": record.threadName,
+            "module": record.module,
+            "func": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage()}
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+
+        if not (res := self._flat(data)):
+            raise ValueError(res.value)
+
+        return res.value
+
+
+_CAPTION_FORMATS = {
+    "debug": "\033[34;7;1m{: ^9.7s}\033[0m",
+    "info": "\033[35;7;1m{: ^9.7s}\033[0m",
+    "warning": "\033[33;7;1m{: ^9.7s}\033[0m",
+    "error": "\033[31;7;1m{: ^9.7s}\033[0m",
+    "critical": "\033[31;7;1m{: ^9.7s}\033[0m",
+    "log": "\033[37;7;1m{: ^10.8s}\033[0m"}
+_TRACE_INFO_FORMAT = "\033[37;3;2m{:s}\033[0m"
+_PROCESS_FORMAT = "\033[43;100;1m PID:{:s} \033[0m"
+_THREAD_FORMAT = "\033[43;100;1m Thread:{:s} \033[0m"
+
+
 class ColoredLogFormatter(Formatter):
     """A colorful logger with a beauty console output and useful trace data, enjoy!
 
     Works in Linux consoles only.
     Fore more info on console colors and formatting:
         `https://misc.flogisoft.com/bash/tip_colors_and_formatting`
+
+    All the colored fragments are built once and cached: level captions,
+    call site locations and the timestamp up to seconds; the timestamp is
+    taken from `record.created`. Process and thread labels of the last record
+    are cached per formatting thread, so they do not pile up with threads.
     """
     def __init__(self, datefmt=None):
 
         self.main_pid = os.getpid()
 
-        super().__init__(fmt="%(message)s", datefmt=datefmt)
-
-    def format(self, record):
-        fmt = type("TextFormat", (object, ), {
-            "normal": "{:s}",
-            "caption": type("TextFormatCaption", (object, ), {
-                "debug": "\033[34;7;1m{: ^9.7s}\033[0m",
-                "info": "\033[35;7;1m{: ^9.7s}\033[0m",
-                "warning": "\033[33;7;1m{: ^9.7s}\033[0m",
-                "error": "\033[31;7;1m{: ^9.7s}\033[0m",
-                "critical": "\033[31;7;1m{: ^9.7s}\033[0m",
-                "log": "\033[37;7;1m{: ^10.8s}\033[0m"}),
-            "trace_info": "\033[37;3;2m{:s}\033[0m",
-            "process": "\033[43;100;1m PID:{:s} \033[0m",
-            "thread": "\033[43;100;1m Thread:{:s} \033[0m"})
-
-        message = fmt.normal.format(record.getMessage())
-        thread_name = record.threadName
-        if thread_name != "MainThread":
-            thread = fmt.thread.format(thread_name)
-            # indent = fmt.thread.format(" "*len(thread_name))
-        else:
-            thread = ""
-
-        indent = ""
+        self._captions = {}
+        self._locations = {}
+        self._labels = local()
+        self._second = (None, "")
 
-        if self.main_pid != record.process:
-            process = fmt.process.format(str(record.process))
-        else:
-            process = ""
-
-        cur_time = fmt.trace_info.format(dt.now().isoformat())
-
-        path_name = record.pathname
-        func_name = fmt.trace_info.format(record.funcName)
-        line_no = fmt.trace_info.format(str(record.lineno))
+        super().__init__(fmt="%(message)s", datefmt=datefmt)
 
-        cur_format = getattr(fmt.caption, record.levelname.lower(), fmt.caption.log)
-        level_name = cur_format.format(record.levelname)
-        # level_no = record.levelno
+    def _caption(self, level_name: str) -> str:
+        if (caption := self._captions.get(level_name)) is None:
+            caption = _CAPTION_FORMATS.get(level_name.lower(), _CAPTION_FORMATS["log"]) \
+                .format(level_name)
+            self._captions[level_name] = caption
+        return caption
+
+    def _location(self, record: LogRecord) -> str:
+        key = (record.pathname, record.funcName, record.lineno)
+        if (location := self._locations.get(key)) is None:
+            location = f"{record.pathname}." \
+                       f"{_TRACE_INFO_FORMAT.format(record.funcName)}:" \
+                       f"{_TRACE_INFO_FORMAT.format(str(record.lineno))}"
+            self._locations[key] = location
+        return location
+
+    def _process_thread(self, record: LogRecord) -> str:
+        key = (record.process, record.threadName)
+        if getattr(self._labels, "key", None) != key:
+            process = "" if record.process == self.main_pid else \
+                _PROCESS_FORMAT.format(str(record.process))
+            thread = "" if record.threadName == "MainThread" else \
+                _THREAD_FORMAT.format(record.threadName)
+            (self._labels.key, self._labels.value) = (key, process + thread)
+        return self._labels.value
+
+    def _time(self, created: float) -> str:
+        """The same as `dt.fromtimestamp(created).isoformat()` colored"""
+        frac, sec = modf(created)
+        usec = round(frac*1e6)
+        if usec >= 1000000:
+            sec += 1
+            usec -= 1000000
+
+        cached_sec, prefix = self._second
+        if cached_sec != sec:
+            prefix = "\033[37;3;2m" + dt.fromtimestamp(sec).isoformat()
+            self._second = (sec, prefix)
+
+        if usec:
+            return f"{prefix}.{usec:06d}\033[0m"
+        return prefix + "\033[0m"
 
-        message = f"\033[0m{indent}{cur_time} " \
-                  f"{path_name}.{func_name}:{line_no}\n" \
-                  f"{process}{thread}{level_name} {message}"
+    def format(self, record):
+        return f"\033[0m{self._time(record.created)} " \
+               f"{self._location(record)}\n" \
+               f"{self._process_thread(record)}{self._caption(record.levelname)} " \
+               f"{record.getMessage()}"
 
-        return message
 
 #
 #   Handlers
@@ -125,60 +308,388 @@ class SysLogHandler(handlers.SysLogHandler):
     def __init__(self):
         super().__init__(address="/dev/log")
 
+
+class Overflow(Enum):
+    """What an async handler does when its queue is full"""
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+    def __str__(self):
+        return self.value
+
+
+ASYNC_OVERFLOW = Overflow.BLOCK
+
+
+class _QueueListener(handlers.QueueListener):
+    """A queue listener that waits for room to put its stop sentinel"""
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class AsyncHandler(handlers.QueueHandler):
+    """Puts records on a bounded queue; a background thread hands them over
+    to the `target` handler, which formats and writes them.
+
+    `overflow` tells what to do with a record when the queue is full:
+        BLOCK - wait for a free slot;
+        DROP_OLDEST - throw away the oldest queued record;
+        DROP_NEWEST - throw away the new record;
+    dropped records are counted in `dropped`.
+
+    The queue is drained when the handler is closed, `logging.shutdown` does
+    it at the interpreter exit.
+
+    A forked child gets a new queue and background thread; records queued
+    before the fork are left to the parent.
+    """
+    def __init__(
+            self,
+            target: Handler,
+            queue_size: Optional[int]=None,
+            overflow: Optional[Overflow]=None):
+
+        super().__init__(Queue(queue_size or ASYNC_QUEUE_SIZE))
+
+        self.target = target
+        self.overflow = Overflow(overflow or ASYNC_OVERFLOW)
+        self.dropped = 0
+
+        self._listener = _QueueListener(self.queue, target, respect_handler_level=True)
+        self._listener.start()
+        _ASYNC_HANDLERS.add(self)
+
+    def _after_fork(self):
+        """Start a new queue and listener in a forked child"""
+        self.queue = Queue(self.queue.maxsize)
+        self._listener = _QueueListener(self.queue, self.target, respect_handler_level=True)
+        self._listener.start()
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        """Merge the message arguments now, as they may change until the record
+        is written; the formatting itself is left to the target handler.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: LogRecord):
+        if self.overflow is Overflow.BLOCK:
+            self.queue.put(record)
+            return
+
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except Full:
+                pass
+
+            self.dropped += 1
+
+            if self.overflow is Overflow.DROP_NEWEST:
+                return
+
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+            except Empty:
+                pass
+
+    def setFormatter(self, fmt: Optional[Formatter]):
+        self.target.setFormatter(fmt)
+
+    def flush(self):
+        """Wait for the queued records to be written"""
+        if self._listener._thread is not None:  # pylint: disable=W0212
+            self.queue.join()
+        self.target.flush()
+
+    def close(self):
+        _ASYNC_HANDLERS.discard(self)
+        if self._listener._thread is not None:  # pylint: disable=W0212
+            self._listener.stop()
+        self.target.close()
+        super().close()
+
+
+# open async handlers, restarted in forked children
+_ASYNC_HANDLERS: "WeakSet[AsyncHandler]" = WeakSet()
+
+
+def _restart_async_handlers():
+    for hlr in list(_ASYNC_HANDLERS):
+        hlr._after_fork()  # pylint: disable=W0212
+
+
+os.register_at_fork(after_in_child=_restart_async_handlers)
+
+class _BufferedWriteMixin:
+    """Collects formatted records and writes them with a single `write()` call
+    when `buffer_size` bytes are collected, `flush_interval` seconds passed
+    since the first collected record or an ERROR record comes.
+
+    A forked child starts with an empty buffer and no timer; records collected
+    before the fork are left to the parent.
+    """
+
+    def _init_buffer(self, buffer_size: Optional[int], flush_interval: Optional[float]):
+        self.buffer_size = buffer_size or WRITE_BUFFER_SIZE
+        self.flush_interval = flush_interval or WRITE_BUFFER_INTERVAL
+        self._buffer = []
+        self._buffered = 0
+        self._timer = None
+        _BUFFERED_HANDLERS.add(self)
+
+    def _after_fork(self):
+        """Drop the parent's records and its timer, which thread is gone"""
+        self._buffer.clear()
+        self._buffered = 0
+        self._timer = None
+
+    def _before_write(self, data: str):
+        """Prepare the stream to write `data` to"""
+
+    def _write_buffer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._buffer:
+            return
+
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+
+        self._before_write(data)
+        if self.stream is None:
+            self.stream = self._open()
+        self.stream.write(data)
+        self.stream.flush()
+
+    def emit(self, record: LogRecord):
+        try:
+            line = self.format(record) + self.terminator
+            self._buffer.append(line)
+            self._buffered += len(line)
+
+            if self._buffered >= self.buffer_size or record.levelno >= ERROR:
+                self._write_buffer()
+            elif self._timer is None:
+                self._timer = Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        except RecursionError:
+            raise
+        except Exception:  # pylint: disable=W0703
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._write_buffer()
+        finally:
+            self.release()
+
+    def close(self):
+        _BUFFERED_HANDLERS.discard(self)
+        self.flush()
+        super().close()
+
+
+# open buffered handlers, reset in forked children
+_BUFFERED_HANDLERS: "WeakSet[_BufferedWriteMixin]" = WeakSet()
+
+
+def _reset_buffered_handlers():
+    for hlr in list(_BUFFERED_HANDLERS):
+        hlr._after_fork()  # pylint: disable=W0212
+
+
+os.register_at_fork(after_in_child=_reset_buffered_handlers)
+
+
+class BufferedRotatingFileHandler(_BufferedWriteMixin, handlers.RotatingFileHandler):
+    """Rotating file handler writing many records at once"""
+    def __init__(
+            self,
+            filename: str,
+            maxBytes: int=0,
+            backupCount: int=0,
+            buffer_size: Optional[int]=None,
+            flush_interval: Optional[float]=None):
+
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding="utf-8")
+        self._init_buffer(buffer_size, flush_interval)
+
+    def _before_write(self, data: str):
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0 and 0 < self.stream.tell() + len(data) >= self.maxBytes:
+            self.doRollover()
+
+
+class BufferedWatchedFileHandler(_BufferedWriteMixin, handlers.WatchedFileHandler):
+    """Watched file handler (see `enable_file`) writing many records at once"""
+    def __init__(
+            self,
+            filename: str,
+            buffer_size: Optional[int]=None,
+            flush_interval: Optional[float]=None):
+
+        super().__init__(filename, encoding="utf-8")
+        self._init_buffer(buffer_size, flush_interval)
+
+    def _before_write(self, data: str):
+        self.reopenIfNeeded()
+
+class RingBufferHandler(Handler):
+    """Keeps the last `capacity` records as they are, without formatting;
+    they are passed to the `target` handler when a record of `flush_level` or
+    higher comes or `dump` is called; `flush` and `close` do not pass them,
+    so a normal exit does not print the records kept.
+
+    Handler filters are not applied; as records are not formatted until the
+    flush, mutable message arguments may change in the meantime.
+    """
+    def __init__(
+            self,
+            target: Handler,
+            capacity: Optional[int]=None,
+            flush_level: int=ERROR):
+
+        super().__init__()
+
+        self.target = target
+        self.flush_level = flush_level
+        self._ring = deque(maxlen=capacity or RING_BUFFER_SIZE)
+
+    def handle(self, record: LogRecord) -> bool:
+        # NOTE: no lock is required, `deque.append` is thread-safe
+        self._ring.append(record)
+        if record.levelno >= self.flush_level:
+            self.dump()
+        return True
+
+    def emit(self, record: LogRecord):
+        self.handle(record)
+
+    def dump(self):
+        """Pass the records kept to the target handler"""
+        self.acquire()
+        try:
+            while self._ring:
+                record = self._ring.popleft()
+                if record.levelno >= self.target.level:
+                    self.target.handle(record)
+            self.target.flush()
+        finally:
+            self.release()
+
+    def flush(self):
+        self.target.flush()
+
+    def close(self):
+        self._ring.clear()
+        self.target.close()
+        super().close()
+
 #
 #   Setup default logger
 #
 
-def setup_logger(level: int, logger: Logger, formatter: Formatter, handler: Handler):
+def make_handler(
+        level: int,
+        formatter: Formatter,
+        handler: Handler,
+        async_: bool=False) -> Handler:
     """
-    Setup logger with custom formatter and Handler
+    Setup handler with custom formatter;
+    if `async_` is set, the handler is wrapped in `AsyncHandler`
     """
     level = level or WARNING
     assert 0 <= level <= 50
 
     handler.setLevel(level)
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
 
+    if async_:
+        handler = AsyncHandler(handler)
+        handler.setLevel(level)
+
+    return handler
 
-def enable_stdout(level: Optional[int]=None):
+
+def setup_logger(
+        level: int,
+        logger: Logger,
+        formatter: Formatter,
+        handler: Handler,
+        async_: bool=False):
+    """
+    Setup logger with custom formatter and Handler;
+    if `async_` is set, the handler is wrapped in `AsyncHandler`
+    """
+    logger.addHandler(make_handler(level, formatter, handler, async_))
+
+
+def enable_stdout(level: Optional[int]=None, async_: bool=False):
     """
     Enable logger with the output to stdout stream
     """
     formatter = ColoredLogFormatter()
     logger = getLogger(DEFAULT_LOGGER_NAME)
-    setup_logger(level or DEFAULT_LOGGER_LEVEL, logger, formatter, StreamHandler(sys.stdout))
+    setup_logger(level or DEFAULT_LOGGER_LEVEL, logger, formatter, StreamHandler(sys.stdout),
+                 async_=async_)
 
 
-def enable_stderr(level: Optional[int]=None):
+def enable_stderr(level: Optional[int]=None, async_: bool=False):
     """
     Enable logger with the output to stderr stream
     """
     formatter = ColoredLogFormatter()
     logger = getLogger(DEFAULT_LOGGER_NAME)
-    setup_logger(level or DEFAULT_LOGGER_LEVEL, logger, formatter, StreamHandler(sys.stderr))
+    setup_logger(level or DEFAULT_LOGGER_LEVEL, logger, formatter, StreamHandler(sys.stderr),
+                 async_=async_)
 
 
-def _enable_file(
+def _make_file_handler(
         level: int,
         path: Union[str, Path],
-        file_log_handler: Callable[[ str ], Handler] ):
-
-    logger = getLogger(DEFAULT_LOGGER_NAME)
+        file_log_handler: Callable[[ str ], Handler],
+        async_: bool=False,
+        formatter: Optional[Formatter]=None) -> Handler:
 
     path = Path(path).absolute()
     if not path.parent.is_dir():
         raise NotADirectoryError(f"Log file parent directory {path.parent} does not exist")
 
-    setup_logger(level,
-                 logger,
-                 FileLogFormatter(),
-                 file_log_handler(str(path)))
+    return make_handler(level,
+                        formatter or FileLogFormatter(),
+                        file_log_handler(str(path)),
+                        async_=async_)
+
+
+def _enable_file(
+        level: int,
+        path: Union[str, Path],
+        file_log_handler: Callable[[ str ], Handler],
+        async_: bool=False,
+        formatter: Optional[Formatter]=None):
+
+    logger = getLogger(DEFAULT_LOGGER_NAME)
+    logger.addHandler(_make_file_handler(level, path, file_log_handler, async_, formatter))
 
 
 def enable_file(
         level: Optional[int]=None,
-        path: Optional[Union[str, Path]]=None):
+        path: Optional[Union[str, Path]]=None,
+        async_: bool=False):
     """
     Enable file logging;
     NOTE:
@@ -188,14 +699,16 @@ def enable_file(
     _enable_file(
         level=level or DEFAULT_LOGGER_LEVEL,
         path=path or Path("./").absolute()/Path(DEFAULT_LOG_FILE_NAME),
-        file_log_handler=handlers.WatchedFileHandler)
+        file_log_handler=handlers.WatchedFileHandler,
+        async_=async_)
 
 
 def enable_rotating_file(
         level: Optional[int]=None,
         path: Optional[Union[str, Path]]=None,
         max_size: Optional[int]=ROTATING_FILE_MAX_SIZE_MB*1024*1024,
-        backupCount: Optional[int]=BACKUP_COUNT):
+        backupCount: Optional[int]=BACKUP_COUNT,
+        async_: bool=False):
     """
     Enable logger with the rotating file output;
     `max_size` is a maximum file size in Mb
@@ -207,70 +720,435 @@ def enable_rotating_file(
         file_log_handler=partial(
             handlers.RotatingFileHandler,
             maxBytes=max_size,
-            backupCount=backupCount))
+            backupCount=backupCount),
+        async_=async_)
+
+
+def enable_jsonl_file(
+        level: Optional[int]=None,
+        path: Optional[Union[str, Path]]=None,
+        max_size: Optional[int]=None,
+        backupCount: Optional[int]=BACKUP_COUNT,
+        buffer_size: Optional[int]=None,
+        flush_interval: Optional[float]=None,
+        async_: bool=False):
+    """
+    Enable logging to a file with a JSON object per line;
+    records are buffered, see `WRITE_BUFFER_SIZE` and `WRITE_BUFFER_INTERVAL`.
+    The file is rotated when `max_size` (in bytes) is given, otherwise it is
+    watched to work well with Unix `logrotate` as in `enable_file`.
+    """
+
+    if max_size:
+        file_log_handler = partial(
+            BufferedRotatingFileHandler,
+            maxBytes=max_size,
+            backupCount=backupCount,
+            buffer_size=buffer_size,
+            flush_interval=flush_interval)
+    else:
+        file_log_handler = partial(
+            BufferedWatchedFileHandler,
+            buffer_size=buffer_size,
+            flush_interval=flush_interval)
+
+    _enable_file(
+        level=level or DEFAULT_LOGGER_LEVEL,
+        path=path or Path("./").absolute()/Path(DEFAULT_JSONL_FILE_NAME),
+        file_log_handler=file_log_handler,
+        async_=async_,
+        formatter=JsonLinesFormatter())
+
+
+def enable_ring_buffer(
+        target: Optional[Handler]=None,
+        capacity: Optional[int]=None,
+        flush_level: int=ERROR) -> RingBufferHandler:
+    """
+    Keep the last records in memory and pass them to the `target` handler
+    (stderr by default) on errors, see `RingBufferHandler`;
+    NOTE:
+        The logger level limits records kept, e.g. set it to DEBUG and
+        set WARNING for other handlers.
+    """
+    target = target or make_handler(1, ColoredLogFormatter(), StreamHandler(sys.stderr))
+
+    handler = RingBufferHandler(target, capacity, flush_level)
+    get_logger().addHandler(handler)
+    return handler
+
+
+def flush_ring_buffers(l: Optional[Logger]=None):
+    """
+    Pass the records kept by all the logger ring buffer handlers to their
+    targets
+    """
+    for hlr in (l or get_logger()).handlers:
+        if isinstance(hlr, RingBufferHandler):
+            hlr.dump()
 
 
 #
 #   `with` syntax support
 #
 
-def _force_log(
-        level: int,
-        log_handler: Callable[[Optional[int]], None]):
+@contextmanager
+def override_log(level: Optional[int]=None, hlrs: Optional[List[Handler]]=None):
+    """
+    Override the default logger level and/or handlers for the current thread
+    or asyncio task only; other threads and tasks are not affected.
+    Overrides may be nested, not given values are inherited.
 
-    # save and clear the logger's state
-    l = get_logger()
-    old_level = l.level
-    d = clear_logger(l)
+    >>> with override_log(logging.DEBUG, [StreamHandler(sys.stderr)]) as l:
+    ...     l.debug("shown for this thread only")
+    """
+    outer_level, outer_hlrs = _LOG_OVERRIDE.get() or (None, None)
 
-    log_handler(level)
-    l.setLevel(level)
+    token = _LOG_OVERRIDE.set((
+        outer_level if level is None else level,
+        outer_hlrs if hlrs is None else hlrs))
+    try:
+        yield get_logger()
+    finally:
+        _LOG_OVERRIDE.reset(token)
 
-    yield l
 
-    # return previous logger state
-    _ = clear_logger(l)
-    for fltr in d["filters"]:
-        l.addFilter(fltr)
-    for hlr in d["handlers"]:
-        l.addHandler(hlr)
-    l.setLevel(old_level)
+def _force_log(level: int, hlr: Handler):
+    try:
+        with override_log(level, [hlr]) as l:
+            yield l
+    finally:
+        hlr.close()
 
 
 @contextmanager
 def force_stderr_log(level: Optional[int]=None):
-    yield from _force_log(level or DEFAULT_LOGGER_LEVEL, enable_stderr)
+    level = level or DEFAULT_LOGGER_LEVEL
+    yield from _force_log(
+        level,
+        make_handler(level, ColoredLogFormatter(), StreamHandler(sys.stderr)))
 
 
 @contextmanager
 def force_rfile_log(
         level: Optional[int]=None,
         path: str="./log.log"):
+    level = level or DEFAULT_LOGGER_LEVEL
     yield from _force_log(
-        level or DEFAULT_LOGGER_LEVEL,
-        partial(enable_rotating_file, path=path))
+        level,
+        _make_file_handler(
+            level,
+            path,
+            partial(
+                handlers.RotatingFileHandler,
+                maxBytes=ROTATING_FILE_MAX_SIZE_MB*1024*1024,
+                backupCount=BACKUP_COUNT)))
 
 
 @contextmanager
 def force_file_log(
         level: Optional[int]=None,
         path: str="./log.log"):
+    level = level or DEFAULT_LOGGER_LEVEL
     yield from _force_log(
-        level or DEFAULT_LOGGER_LEVEL,
-        partial(enable_file, path=path))
+        level,
+        _make_file_handler(level, path, handlers.WatchedFileHandler))
+
+
+#
+#   Results logging
+#
+
+_LEVEL_METHODS = {"debug": 10, "info": 20, "warning": 30, "error": 40, "critical": 50}
+
+_SUMMARY_REPR = reprlib.Repr()
+
+
+def summary_type(res: Any) -> str:
+    """Summarize a result with its type name"""
+    return type(res).__name__
 
 
-def wrapper_with_log(log_hlr, msg_prefix=None):
+def summary_size(res: Any) -> str:
+    """Summarize a result with its type name and length"""
+    try:
+        return f"{type(res).__name__}(len={len(res)})"
+    except TypeError:
+        return type(res).__name__
+
+
+def summary_repr(size: int=80) -> Callable[[Any], str]:
+    """Returns a summary with first `size` characters of a result `repr`"""
+    return lambda res: _SUMMARY_REPR.repr(res)[:size]
+
+
+def wrapper_with_log(
+        log_hlr: Callable[..., None],
+        msg_prefix: Optional[str]=None,
+        summary: Optional[Callable[[Any], Any]]=None):
+    """
+    Log a function result and the call duration with `log_hlr`; `summary`
+    is applied to a result before logging, e.g. `summary_size`.
+
+    If `log_hlr` is a logger method, like `LOG.debug`, nothing is done unless
+    the logger is enabled for the level.
+    """
+
+    logger = getattr(log_hlr, "__self__", None)
+    level = _LEVEL_METHODS.get(getattr(log_hlr, "__name__", None))
+    is_enabled = logger.isEnabledFor if isinstance(logger, Logger) and level else None
+
+    msg = (msg_prefix + ": " if msg_prefix else "") + "%s (%.3f ms)"
 
     def wrap_in_log(f):
 
         @wraps(f)
         def g(*a, **k):
+            if is_enabled is not None and not is_enabled(level):
+                return f(*a, **k)
+
+            t = perf_counter()
             res = f(*a, **k)
-            log_hlr(( msg_prefix + ": " if msg_prefix else "") + "%s", res)
+            log_hlr(msg, summary(res) if summary else res, (perf_counter() - t)*1e3)
 
             return res
 
         return g
 
     return wrap_in_log
+
+
+def test_colored_log_formatter():
+    """testing the colored formatter output"""
+
+    record = LogRecord("soners", 20, "/a/b.py", 7, "x=%d", (1, ), None, func="f")
+    record.created = 1600000000.5
+    record.threadName = "T"
+    record.process = -1
+
+    assert ColoredLogFormatter().format(record) == \
+        "\033[0m\033[37;3;2m" + dt.fromtimestamp(record.created).isoformat() + "\033[0m " \
+        "/a/b.py.\033[37;3;2mf\033[0m:\033[37;3;2m7\033[0m\n" \
+        "\033[43;100;1m PID:-1 \033[0m\033[43;100;1m Thread:T \033[0m" \
+        "\033[35;7;1m  INFO   \033[0m x=1"
+
+
+def test_rate_limit_filter():
+    """testing the rate limit filter"""
+
+    def make_record(level, created):
+        record = LogRecord("soners", level, "/a/b.py", 7, "x=%d", (1, ), None)
+        record.created = created
+        return record
+
+    fltr = RateLimitFilter(rate=1, burst=2, debug_sample=3)
+
+    assert [fltr.filter(make_record(30, 0)) for _ in range(4)] == [True, True, False, False]
+
+    record = make_record(30, 1)
+    assert fltr.filter(record)
+    assert record.suppressed == 2
+    assert record.getMessage() == "x=1 [2 similar records suppressed]"
+
+    assert [fltr.filter(make_record(10, 0)) for _ in range(7)] == \
+        [True, False, False, True, False, False, True]
+
+
+def test_override_log():
+    """testing context-local logger overrides"""
+
+    import logging  # pylint: disable=C0415
+    from threading import Thread  # pylint: disable=C0415
+
+    l = get_logger()
+    old_level = l.level
+    l.setLevel(WARNING)
+
+    outer, inner = _ListHandler(), _ListHandler()
+    l.addHandler(outer)
+    try:
+        with override_log(DEBUG, [inner]):
+            l.debug("inner")
+            thread = Thread(target=l.warning, args=("outer", ))
+            thread.start()
+            thread.join()
+            with override_log(ERROR):
+                l.warning("dropped")
+            logging.disable(ERROR)
+            try:
+                l.error("dropped")
+            finally:
+                logging.disable(logging.NOTSET)
+        l.debug("dropped")
+        l.warning("outer again")
+    finally:
+        l.removeHandler(outer)
+        l.setLevel(old_level)
+
+    assert inner.records == ["inner"]
+    assert outer.records == ["outer", "outer again"]
+
+
+class _ListHandler(Handler):
+    """Collects messages"""
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record.getMessage())
+
+
+def test_ring_buffer_handler():
+    """testing the ring buffer handler"""
+
+    def make_record(level, msg):
+        return LogRecord("soners", level, "/a/b.py", 7, msg, None, None)
+
+    target = _ListHandler()
+    hlr = RingBufferHandler(target, capacity=2)
+
+    for (i, level) in enumerate([DEBUG, DEBUG, WARNING]):
+        hlr.handle(make_record(level, str(i)))
+    hlr.flush()
+    assert target.records == []
+
+    hlr.handle(make_record(ERROR, "3"))
+    assert target.records == ["2", "3"]
+
+    hlr.handle(make_record(DEBUG, "4"))
+    hlr.close()
+    assert target.records == ["2", "3"]
+
+
+class _BlockingHandler(Handler):
+    """Collects messages, each one waits for `unblock` to be set"""
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.started = Event()
+        self.unblock = Event()
+
+    def emit(self, record):
+        self.started.set()
+        self.unblock.wait(5)
+        self.records.append(record.getMessage())
+
+
+def test_async_handler_overflow():
+    """testing async handler queue overflow policies"""
+
+    from threading import Thread  # pylint: disable=C0415
+
+    def make_record(i):
+        return LogRecord("soners", 20, "/a/b.py", 7, "%d", (i, ), None)
+
+    for (overflow, expected) in [
+            (Overflow.DROP_NEWEST, ["0", "1", "2"]),
+            (Overflow.DROP_OLDEST, ["0", "4", "5"]),
+            (Overflow.BLOCK, ["0", "1", "2", "3", "4", "5"])]:
+
+        target = _BlockingHandler()
+        hlr = AsyncHandler(target, queue_size=2, overflow=overflow)
+
+        hlr.handle(make_record(0))
+        assert target.started.wait(5)
+
+        thread = Thread(target=lambda: [hlr.handle(make_record(i)) for i in range(1, 6)])
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive() == (overflow is Overflow.BLOCK)
+
+        target.unblock.set()
+        thread.join()
+        hlr.close()
+
+        assert target.records == expected
+        assert hlr.dropped == (0 if overflow is Overflow.BLOCK else 3)
+
+
+def test_async_handler_fork(tmp_path):
+    """testing an async handler in a forked child"""
+
+    from logging import FileHandler  # pylint: disable=C0415
+    from time import sleep  # pylint: disable=C0415
+
+    flnm = tmp_path/"log.log"
+    hlr = AsyncHandler(FileHandler(flnm, encoding="utf-8"))
+
+    if (pid := os.fork()) == 0:
+        hlr.handle(LogRecord("soners", 20, "/a/b.py", 7, "child", None, None))
+        hlr.close()
+        os._exit(0)  # pylint: disable=W0212
+
+    for _ in range(100):
+        if os.waitpid(pid, os.WNOHANG)[0]:
+            break
+        sleep(0.05)
+    else:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+        assert False, "the child process hangs"
+
+    hlr.close()
+    assert flnm.read_text(encoding="utf-8") == "child\n"
+
+
+def test_buffered_file_handler_fork(tmp_path):
+    """testing a buffered file handler: records are collected until an error,
+    a forked child writes its own records only"""
+
+    from time import sleep  # pylint: disable=C0415
+
+    flnm = tmp_path/"log.log"
+    hlr = BufferedWatchedFileHandler(str(flnm), flush_interval=60)
+
+    hlr.handle(LogRecord("soners", 20, "/a/b.py", 7, "parent", None, None))
+    assert not flnm.read_text(encoding="utf-8")
+
+    if (pid := os.fork()) == 0:
+        hlr.flush_interval = 0.1
+        hlr.handle(LogRecord("soners", 20, "/a/b.py", 7, "child", None, None))
+        sleep(0.5)
+        os._exit(0)  # pylint: disable=W0212
+    os.waitpid(pid, 0)
+    assert flnm.read_text(encoding="utf-8") == "child\n"
+
+    hlr.handle(LogRecord("soners", 40, "/a/b.py", 7, "error", None, None))
+    assert flnm.read_text(encoding="utf-8") == "child\nparent\nerror\n"
+    hlr.close()
+
+
+def test_wrapper_with_log():
+    """testing result logging: summaries and disabled levels"""
+
+    import logging  # pylint: disable=C0415
+
+    l = get_logger()
+    hlr = _ListHandler()
+    summarized = []
+
+    def summary(res):
+        summarized.append(res)
+        return summary_size(res)
+
+    def f(n):
+        return list(range(n))
+
+    with override_log(logging.INFO, [hlr]):
+        assert wrapper_with_log(l.debug, "f", summary)(f)(2) == [0, 1]
+        assert not summarized and not hlr.records
+
+        assert wrapper_with_log(l.info, "f", summary)(f)(3) == [0, 1, 2]
+        wrapper_with_log(l.warning, summary=summary_repr(6))(f)(9)
+        wrapper_with_log(l.info, summary=summary_type)(f)(1)
+        wrapper_with_log(l.info)(f)(1)
+
+    assert summarized == [[0, 1, 2]]
+    assert [msg.rsplit(" (", 1)[0] for msg in hlr.records] == \
+        ["f: list(len=3)", "[0, 1,", "list", "[0]"]
+    assert all(msg.endswith(" ms)") for msg in hlr.records)
+
+    lines = []
+    wrapper_with_log(lambda msg, *a: lines.append(msg % a))(f)(0)
+    assert lines[0].startswith("[] (")
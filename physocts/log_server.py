@@ -0,0 +1,187 @@
+"""
+file: log_server.py
+author: Nikolay S. Vasil'ev
+description: collect log records of child processes in the parent process
+
+Only the parent process handlers format and write records, children send
+their records over a Unix socket; this way many processes may share the same
+log file. `ColoredLogFormatter` shows child PIDs.
+
+>>> log.enable_rotating_file(logging.INFO)
+>>> log_server.start()                       # in the parent process
+>>> log_server.attach()                      # in a child process
+
+The server address is put into the `SONERS_LOG_SERVER` environment variable,
+so children find it both when forked and spawned. Children send all their
+records by default, the parent logger level and handler levels filter them.
+"""
+
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import threading
+import socketserver
+from pathlib import Path
+from logging import Logger, makeLogRecord, handlers
+from typing import Optional, Union
+
+from .log import get_logger
+
+LOG_SERVER_ENV = "SONERS_LOG_SERVER"
+SOCKET_FILE_NAME = "log.sock"
+
+
+class _RecordStreamHandler(socketserver.StreamRequestHandler):
+    """Reads records sent by `logging.handlers.SocketHandler`"""
+
+    def handle(self):
+        while len(header := self.rfile.read(4)) == 4:
+            size = struct.unpack(">L", header)[0]
+            if len(data := self.rfile.read(size)) < size:
+                return
+            record = makeLogRecord(pickle.loads(data))
+            if self.server.logger.isEnabledFor(record.levelno):
+                self.server.logger.handle(record)
+
+
+class _RecordServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, address: str, logger: Logger):
+        self.logger = logger
+        super().__init__(address, _RecordStreamHandler)
+
+
+class LogServer:
+    """Log records server, records are passed to the `logger` handlers"""
+
+    def __init__(self, address: Optional[Union[str, Path]]=None, logger: Optional[Logger]=None):
+
+        # NOTE: records are unpickled, so the socket is placed in a directory
+        # accessible by the current user only
+        self._dir = None if address else tempfile.mkdtemp(prefix="soners-")
+        self.address = str(address or Path(self._dir)/SOCKET_FILE_NAME)
+
+        self._server = _RecordServer(self.address, logger or get_logger())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="LogServer",
+            daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+        if self._dir:
+            shutil.rmtree(self._dir, ignore_errors=True)
+        else:
+            Path(self.address).unlink(missing_ok=True)
+
+
+_SERVER: Optional[LogServer] = None
+
+
+def start(address: Optional[Union[str, Path]]=None) -> str:
+    """
+    Start the log server for the default logger; returns the server address
+    """
+    global _SERVER  # pylint: disable=W0603
+    assert _SERVER is None, "The log server is already started"
+
+    _SERVER = LogServer(address)
+    _SERVER.start()
+    os.environ[LOG_SERVER_ENV] = _SERVER.address
+
+    return _SERVER.address
+
+
+def stop():
+    """
+    Stop the log server
+    """
+    global _SERVER  # pylint: disable=W0603
+    if _SERVER is None:
+        return
+
+    _SERVER.stop()
+    _SERVER = None
+    os.environ.pop(LOG_SERVER_ENV, None)
+
+
+def attach(address: Optional[Union[str, Path]]=None, level: Optional[int]=None) -> handlers.SocketHandler:
+    """
+    Replace the default logger handlers with a sender to the log server;
+    the address is taken from the environment if not given.
+    Records of all levels are sent unless `level` is given: a spawned child
+    does not inherit the parent logger level
+    """
+    address = address or os.environ.get(LOG_SERVER_ENV)
+    if not address:
+        raise RuntimeError(f"The log server address is not given and `{LOG_SERVER_ENV}` is not set")
+
+    logger = get_logger()
+    # NOTE: handlers inherited on fork are not closed, that would write their
+    # buffers once more
+    for hlr in list(logger.handlers):
+        logger.removeHandler(hlr)
+
+    handler = handlers.SocketHandler(str(address), None)
+    logger.addHandler(handler)
+    logger.setLevel(level or 1)
+
+    return handler
+
+
+def _log_in_child(msg: str):
+    handler = attach()
+    get_logger().debug("%s: debug", msg)
+    get_logger().info("%s: info", msg)
+    handler.close()
+
+
+def test_log_server():
+    """testing records of forked and spawned children"""
+
+    import time  # pylint: disable=C0415
+    import logging  # pylint: disable=C0415
+    import multiprocessing  # pylint: disable=C0415
+
+    class ListHandler(logging.Handler):
+        """Collects messages"""
+        def __init__(self):
+            super().__init__()
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record.getMessage())
+
+    logger = get_logger()
+    (old_level, hlr) = (logger.level, ListHandler())
+    logger.setLevel(logging.INFO)
+    logger.addHandler(hlr)
+
+    start()
+    try:
+        for method in ["fork", "spawn"]:
+            ctx = multiprocessing.get_context(method)
+            proc = ctx.Process(target=_log_in_child, args=(method, ))
+            proc.start()
+            proc.join()
+            assert proc.exitcode == 0
+
+        expected = ["fork: info", "spawn: info"]
+        for _ in range(100):
+            if sorted(hlr.records) == expected:
+                break
+            time.sleep(0.05)
+        assert sorted(hlr.records) == expected
+    finally:
+        stop()
+        logger.removeHandler(hlr)
+        logger.setLevel(old_level)
@@ -27,16 +27,50 @@ EXAMPLE:
 >>> dict(d))
 >>> d.a.b.c = "one"
 >>> dict(d)
+
+Instances remember the subtrees changed by attribute and item writes, so
+`bool(d)` validates only these against their sub-schemas once the data was
+found valid; `validate(d, full=True)` validates the whole data. Containers
+handed out as is, e.g. by `d["a"]` or a list attribute, are validated on the
+next check as they may be changed; changes made through references kept
+after that check are not tracked.
+
+The default data is copied once per type and shared by its instances; an
+instance copies the default containers on the path it writes to and the
+items returned as is, e.g. by `d["a"]`.
+
+Types are interned: the same schema and default data give the same type,
+while it is in use, see `registry_stats`.
+
+For stable schemas `SchemaClass(cur_schema)` makes a class with a slot per
+property, nested objects become nested classes:
+
+>>> Data = SchemaClass(cur_schema)
+>>> d = Data({"a": {"b": {"c": "one"}}})
+>>> d.a.b.c
+>>> d.a.b.c = 1        # TypeError
+>>> d.to_dict()
 """
 
+import os
+import re
 import copy
+import json
+import hashlib
+from threading import Lock
+from weakref import WeakValueDictionary
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Any, List, Optional, Set, Tuple, Iterable, Iterator, Union
+
 import jsonschema
-from functools import partial
-from typing import Callable, Any
 
 from .log import get_logger
 from .func import relax
 from .dict_ext import dict_join
+from .either import Either, EitherType
 
 def validator(schema, log_hlr, x):
     """Returns True if valid, False otherwise"""
@@ -51,12 +85,195 @@ def validator(schema, log_hlr, x):
     return True
 
 
+def compile_validator(schema: dict) -> Any:
+    """
+    A validator instance of the schema draft, the schema is checked once here
+    """
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+def make_validator(compiled: Any, log_hlr: Callable) -> Callable[[Any], bool]:
+    """
+    Returns a function, which returns True if valid, False otherwise;
+    the error message is built for invalid data only
+    """
+
+    def g(x):
+        if compiled.is_valid(x):
+            return True
+        log_hlr("Validation error: \n%s", jsonschema.exceptions.best_match(compiled.iter_errors(x)))
+        return False
+
+    return g
+
+
+# keywords, which make a value validity depend on other parts of the data
+_NON_LOCAL_KEYWORDS = frozenset([
+    "$ref", "$dynamicRef", "$recursiveRef", "allOf", "anyOf", "oneOf", "not",
+    "if", "then", "else", "dependencies", "dependentSchemas", "enum", "const",
+    "unevaluatedProperties", "unevaluatedItems", "uniqueItems", "contains"])
+
+
+def sub_schema(schema: Any, key: Any) -> Optional[Any]:
+    """
+    The schema of `key` item of data valid against `schema`, if the item
+    may be validated separately, None otherwise
+    """
+    if not isinstance(schema, dict) or not _NON_LOCAL_KEYWORDS.isdisjoint(schema):
+        return None
+
+    if isinstance(key, str):
+        subs = [sub for pattern, sub in schema.get("patternProperties", {}).items()
+                if re.search(pattern, key)]
+        if key in schema.get("properties", {}):
+            subs.append(schema["properties"][key])
+        return (subs or [schema.get("additionalProperties", True)])[0] if len(subs) < 2 else None
+
+    (prefix, rest) = (schema["items"], schema.get("additionalItems", True)) \
+        if isinstance(schema.get("items"), list) else \
+        (schema.get("prefixItems", []), schema.get("items", True))
+    return prefix[key] if key < len(prefix) else rest
+
+
+_ATOMIC_TYPES = (str, bytes, int, float, complex, bool, type(None))
+
+
+def node_ids(data: Any) -> Set[int]:
+    """Identities of all the containers and other mutable items in the data"""
+    (ids, nodes) = (set(), [data])
+    while nodes:
+        if isinstance(node := nodes.pop(), _ATOMIC_TYPES):
+            continue
+        ids.add(id(node))
+        if isinstance(node, dict):
+            nodes.extend(node.values())
+        elif isinstance(node, (list, tuple)):
+            nodes.extend(node)
+    return ids
+
+
+def owned_copy(root: Any, item: Any) -> Any:
+    """
+    The root instance copy of a shared default container; `root._owned` maps
+    the default containers ids to the copies made, so the same one is given
+    for all the references to a container
+    """
+    if (item_copy := root._owned.get(id(item))) is None:
+        item_copy = copy.copy(item) if isinstance(item, (dict, list)) else copy.deepcopy(item)
+        root._owned[id(item)] = item_copy
+    return item_copy
+
+
+def unshare(root: Any, data: Any):
+    """Replace the shared default containers in the data with their copies"""
+    # NOTE: the data may refer to itself
+    (shared, nodes, seen) = (root._default_ids, [data], set())
+    while nodes:
+        if id(node := nodes.pop()) in seen:
+            continue
+        seen.add(id(node))
+        items = node.items() if isinstance(node, dict) else \
+            enumerate(node) if isinstance(node, list) else ()
+        for key, item in list(items):
+            if id(item) in shared:
+                node[key] = item = owned_copy(root, item)
+                nodes.append(item)
+            elif isinstance(item, (dict, list)):
+                nodes.append(item)
+
+
 LOG = get_logger()
 
 
 META_INST_NAME = "CustomData"
 
 
+def _canonical(data: Any) -> Any:
+    """A hashable form of data telling apart types, e.g. 1 and "1" keys"""
+    if isinstance(data, dict):
+        return ("dict", tuple(sorted((repr(key), _canonical(value)) for key, value in data.items())))
+    if isinstance(data, (list, tuple)):
+        return (type(data).__name__, tuple(map(_canonical, data)))
+    return (type(data).__name__, repr(data))
+
+
+def fingerprint(schema: Any, default_data: Any) -> str:
+    """A canonical digest of a schema and default data"""
+    data = [schema, default_data]
+    # NOTE: JSON is used if it keeps the data as is: no tuples, non string
+    # keys or other types
+    try:
+        text = json.dumps(data, sort_keys=True)
+        if json.loads(text) != data:
+            raise TypeError
+    except (TypeError, ValueError):
+        text = repr(_canonical(data))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# fingerprint -> `DataMeta` type, while the type is referenced
+_REGISTRY: "WeakValueDictionary[str, type]" = WeakValueDictionary()
+_REGISTRY_LOCK = Lock()
+_REGISTRY_STATS = {"hits": 0, "misses": 0}
+
+
+def registry_stats() -> dict:
+    """The number of interned `DataMeta` types, hits and misses"""
+    with _REGISTRY_LOCK:
+        return {"size": len(_REGISTRY), **_REGISTRY_STATS}
+
+
+def registry_clear():
+    """Forget the interned types and reset the statistics"""
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
+        _REGISTRY_STATS.update(hits=0, misses=0)
+
+FROM_MANY_CHUNK_SIZE = 1000
+
+
+@dataclass
+class Rejected:
+    """A row failed to become a valid instance"""
+    index: int
+    row: Any
+    errors: List[str]
+
+
+def error_message(err: jsonschema.ValidationError) -> str:
+    """A validation error message with the data path"""
+    path = "/".join(map(str, err.absolute_path))
+    return f"{path}: {err.message}" if path else err.message
+
+
+def check_row(cls: Any, row: Any, validate: bool) -> Union[Any, List[str]]:
+    """An instance of the row, or the error messages"""
+    try:
+        inst = cls(row)
+    except (AssertionError, KeyError, TypeError) as err:
+        return [f"{type(err).__name__}: {err}"]
+    if not validate or DataMeta.cls_is_valid(inst):
+        return inst
+    return [error_message(err) for err in DataMeta.cls_errors(inst)]
+
+
+# the type validating rows in a worker process
+_WORKER_TYPE = None
+
+
+def _init_worker(schema: dict, default_data: dict):
+    global _WORKER_TYPE  # pylint: disable=W0603
+    _WORKER_TYPE = DataMeta(schema, default_data)
+
+
+def _check_rows(rows: List[Any]) -> List[Optional[List[str]]]:
+    """The error messages per row, None for valid ones"""
+    return [errors if isinstance(errors := check_row(_WORKER_TYPE, row, True), list) else None
+            for row in rows]
+
+
 class DataMeta:
     """Data meta class, used to validate and simplify work with dictionaries
     """
@@ -66,53 +283,227 @@ class DataMeta:
         assert isinstance(data, dict), "Data given is not a dictionary: %r" % repr(data)
 
 
-        # This should prevent side-effects from external references to the
-        # default data instance.
-        try:
-            default_data = copy.deepcopy(obj._default_data)  # pylint: disable=E1101
-        except TypeError as err:
-            LOG.warning("Invalid data given, failed to deepcopy: \"%r\"", err)
-            raise err
-
         # `keys` key is required to convert to a dictionary.
         if "keys" in data.keys():
             raise KeyError("Data confilict: key: `keys`")
 
-        cur_data = dict_join(default_data, data)
+        # NOTE: the default data containers are shared, see `DataMeta.own`
+        cur_data = dict_join(obj._default_data, data)  # pylint: disable=E1101
+        if cur_data is obj._default_data:  # pylint: disable=E1101
+            cur_data = dict(cur_data)
 
         obj._data = cur_data  # pylint: disable=W0201
+        # default container id -> its copy, see `owned_copy`
+        obj._owned = {}  # pylint: disable=W0201
+        # changed subtree paths since the data was found valid, None if the
+        # data is to be validated fully
+        obj._dirty = None  # pylint: disable=W0201
 
     def cls_init_no_copy(obj, data):  # pylint: disable=E0213
         """A new type constructor"""
         obj._data = data  # pylint: disable=W0201
 
-    def cls_validate(obj):  # pylint: disable=E0213
-        """Validate object data using a custom validator"""
-        return obj._validator(obj._data)  # pylint: disable=E1101
+    def cls_init_nested(obj, data, root=None, path=()):  # pylint: disable=E0213
+        """A nested dictionary proxy constructor"""
+        object.__setattr__(obj, "_data", data)
+        object.__setattr__(obj, "_root", root)
+        object.__setattr__(obj, "_path", path)
+
+    def cls_validate(obj, full: bool=False) -> bool:  # pylint: disable=E0213
+        """
+        Validate object data using a custom validator, only the changed
+        subtrees are validated unless `full`
+        """
+        if full or obj._dirty is None:  # pylint: disable=E1101
+            valid = obj._validator(obj._data)  # pylint: disable=E1101
+        else:
+            valid = all(DataMeta.validate_path(obj, path) for path in obj._dirty)  # pylint: disable=E1101
+
+        obj._dirty = set() if valid else None  # pylint: disable=W0201
+        return valid
+
+    def validate_path(obj, path: Tuple) -> bool:  # pylint: disable=E0213
+        """Validate a subtree against its sub-schema, or all the data"""
+        (data, schema) = (obj._data, obj._schema)  # pylint: disable=E1101
+        for key in path:
+            if (sub := sub_schema(schema, key)) is None:
+                break
+            try:
+                (data, schema) = (data[key], sub)
+            except (KeyError, IndexError, TypeError):
+                return obj._validator(obj._data)  # pylint: disable=E1101
+
+        if (compiled := obj._sub_validators.get(id(schema))) is None:  # pylint: disable=E1101
+            compiled = obj._compiled_validator.evolve(schema=schema)  # pylint: disable=E1101
+            obj._sub_validators[id(schema)] = compiled  # pylint: disable=E1101
+        return make_validator(compiled, LOG.warning)(data)
+
+    def mark_dirty(obj, key, is_new: bool):  # pylint: disable=E0213
+        """Remember a changed subtree, the parent one if a key is added"""
+        if (root := obj._root) is None or (dirty := root._dirty) is None:  # pylint: disable=E1101
+            return
+        path = obj._path if is_new else obj._path + (key, )  # pylint: disable=E1101
+        if not any(path[:i] in dirty for i in range(len(path) + 1)):
+            root._dirty = {p for p in dirty if p[:len(path)] != path} | {path}  # pylint: disable=W0212
+
+    def cls_is_valid(obj) -> bool:  # pylint: disable=E0213
+        """Validate object data, no errors are reported"""
+        return obj._compiled_validator.is_valid(obj._data)  # pylint: disable=E1101
+
+    def cls_errors(obj) -> List[jsonschema.ValidationError]:  # pylint: disable=E0213
+        """All validation errors of object data"""
+        return sorted(
+            obj._compiled_validator.iter_errors(obj._data),  # pylint: disable=E1101
+            key=lambda err: list(err.absolute_path))
+
+    def cls_data(obj):  # pylint: disable=E0213
+        """
+        Object data; a proxy of a shared default dictionary gets the copy of
+        the root instance, if it was made
+        """
+        data = obj._data
+        # NOTE: the root instance data is never shared
+        if type(obj) is not NestedData or (root := obj._root) is None or \
+                id(data) not in root._default_ids:  # pylint: disable=C0123
+            return data
+        if (data_copy := root._owned.get(id(data))) is None:
+            return data
+        _SET_NESTED_DATA(obj, data_copy)
+        return data_copy
+
+    def own(obj) -> Any:  # pylint: disable=E0213
+        """
+        Object data to be changed: a shared default dictionary is copied, the
+        copy replaces it in the root data unless it was replaced already
+        """
+        data = DataMeta.cls_data(obj)
+        if (root := obj._root) is None or id(data) not in root._default_ids:
+            return data
+
+        data_copy = owned_copy(root, data)
+        (shared, path, node) = (root._default_ids, obj._path, root._data)
+        try:
+            for key in path[:-1]:
+                if id(item := node[key]) in shared:
+                    item = node[key] = owned_copy(root, item)
+                node = item
+            if node[path[-1]] is data:
+                node[path[-1]] = data_copy
+        except (KeyError, IndexError, TypeError):
+            pass
+        _SET_NESTED_DATA(obj, data_copy)
+        return data_copy
+
+    def own_item(obj, key) -> Any:  # pylint: disable=E0213
+        """A container item to be handed out, with no shared default containers"""
+        # NOTE: the item may be changed by the caller
+        DataMeta.mark_dirty(obj, key, False)
+        (root, data) = (obj._root, DataMeta.own(obj))
+        if id(item := data[key]) in root._default_ids:
+            item = data[key] = owned_copy(root, item)
+        unshare(root, item)
+        return item
+
+    def owned_data(obj) -> dict:  # pylint: disable=E0213
+        """Object data with no shared default containers in it"""
+        if obj._root is None:
+            return obj._data
+        data = DataMeta.own(obj)
+        unshare(obj._root, data)
+        return data
 
     def cls_getitem(obj, key):  # pylint: disable=E0213
-        return obj._data[key]
+        item = DataMeta.cls_data(obj)[key]
+        if isinstance(item, _ATOMIC_TYPES) or obj._root is None:
+            return item
+        return DataMeta.own_item(obj, key)
 
     def cls_getattr(obj, name):  # pylint: disable=E0213
         # print("getattr: %r" % name)
-        cur_dict = obj._data
-        if not name in cur_dict.keys():
+        b_nested = type(obj) is NestedData  # pylint: disable=C0123
+        try:
+            item = (DataMeta.cls_data(obj) if b_nested else obj._data)[name]
+        except KeyError:
             return None
-        data = cur_dict[name]
-        if not isinstance(data, dict):
-            return data
-        return type(META_INST_NAME, (object, ),
-                    {**DataMeta.METHODS, "__init__": DataMeta.cls_init_no_copy})(data)
+        if isinstance(item, _ATOMIC_TYPES):
+            return item
+        root = obj._root if b_nested else obj
+        if isinstance(item, dict):
+            return nested_data(item, root, obj._path + (name, ))
+        if root is None:
+            return item
+        if id(item) not in root._default_ids:
+            # NOTE: the item may be changed by the caller
+            DataMeta.mark_dirty(obj, name, False)
+            return item
+        return DataMeta.own_item(obj, name)
 
     def cls_setattr(obj, key, value):  # pylint: disable=E0213
         # print("cls_setattr, key=%r, value=%r" % (key, value))
         if key[0] == "_":
-            obj.__dict__[key] = value
+            object.__setattr__(obj, key, value)
             return
+        DataMeta.cls_setitem(obj, key, value)
+
+    def cls_setitem(obj, key, value):  # pylint: disable=E0213
+        data = DataMeta.own(obj)
+        DataMeta.mark_dirty(obj, key, key not in data)
         if type(value).__name__ == META_INST_NAME:
-            obj._data[key] = value._data  # pylint: disable=W0212
+            data[key] = DataMeta.owned_data(value)
             return
-        obj._data[key] = value
+        data[key] = value
+
+    def cls_from_many(
+            cls,
+            rows: Iterable[Any],
+            workers: Optional[int]=None,
+            validate: bool=True,
+            chunk_size: int=FROM_MANY_CHUNK_SIZE) -> Iterator[EitherType[Any]]:
+        """
+        Instances of many rows, validated in parallel with `workers`
+        processes, each compiles the schema once; yields in the rows order
+        Right instances of valid rows and Left `Rejected` ones for the others
+        """
+        rows = iter(rows)
+        chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+        workers = workers or os.cpu_count() or 1
+
+        if not validate or workers == 1:
+            results = ((chunk, [check_row(cls, row, validate) for row in chunk])
+                       for chunk in chunks)
+        else:
+            results = DataMeta.check_in_processes(cls, chunks, workers)
+
+        index = 0
+        for (chunk, checked) in results:
+            for (row, res) in zip(chunk, checked):
+                if res is None:
+                    res = check_row(cls, row, False)
+                yield Either.left(Rejected(index, row, res)) if isinstance(res, list) \
+                    else Either.right(res)
+                index += 1
+
+    def check_in_processes(
+            cls,
+            chunks: Iterator[List[Any]],
+            workers: int) -> Iterator[Tuple[List[Any], List[Optional[List[str]]]]]:
+        """Chunks with the error messages per row, at most 2 chunks a worker in flight"""
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(cls._schema, cls._default_data)) as executor:
+            in_flight = deque()
+            try:
+                for chunk in chunks:
+                    in_flight.append((chunk, executor.submit(_check_rows, chunk)))
+                    if len(in_flight) >= 2*workers:
+                        (done, ftr) = in_flight.popleft()
+                        yield (done, ftr.result())
+                while in_flight:
+                    (done, ftr) = in_flight.popleft()
+                    yield (done, ftr.result())
+            finally:
+                executor.shutdown(cancel_futures=True)
 
     def cls_deepcopy(obj, memo):  # pylint: disable=E0213, disable=W0613
         obj.__dict__ = copy.deepcopy(obj.__dict__)
@@ -122,8 +513,9 @@ class DataMeta:
         "__getattr__": cls_getattr,
         "__setattr__": cls_setattr,
         "__getitem__": cls_getitem,
+        "__setitem__": cls_setitem,
         "__deepcopy__": cls_deepcopy,
-        "keys": lambda obj: obj._data.keys()}  # pylint: disable=W0212
+        "keys": lambda obj: DataMeta.cls_data(obj).keys()}
 
     def __new__(cls, schema: dict=None, default_data: dict=None) -> Any:
         """
@@ -134,10 +526,25 @@ class DataMeta:
             must comply deepcopy
         """
         schema = schema or {}
-        default_data = default_data or {}
 
         assert isinstance(schema, dict)
 
+        key = fingerprint(schema, default_data or {})
+        with _REGISTRY_LOCK:
+            if (cur_type := _REGISTRY.get(key)) is not None:
+                _REGISTRY_STATS["hits"] += 1
+                return cur_type
+            _REGISTRY_STATS["misses"] += 1
+
+        # This should prevent side-effects from external references to the
+        # default data and schema instances.
+        try:
+            schema = copy.deepcopy(schema)
+            default_data = copy.deepcopy(default_data or {})
+        except TypeError as err:
+            LOG.warning("Invalid data given, failed to deepcopy: \"%r\"", err)
+            raise err
+
         # Get a new type name from schema's ID
         # assert isinstance(schema, dict), "Schema must be a dictionary"
         # name = schema.get("title", "Unknown")
@@ -146,7 +553,8 @@ class DataMeta:
         name = META_INST_NAME
 
 
-        vldtr = partial(validator, schema, LOG.warning)
+        compiled = compile_validator(schema)
+        vldtr = make_validator(compiled, LOG.warning)
 
         bases = (object, )
 
@@ -154,16 +562,401 @@ class DataMeta:
             **DataMeta.METHODS,
             "__init__": DataMeta.cls_init,
             "_default_data": default_data,
+            "_default_ids": frozenset(node_ids(default_data)),
             "_schema": schema,
             "_validator": staticmethod(vldtr),
+            "_compiled_validator": compiled,
+            "_sub_validators": {},
+            "_root": property(lambda obj: obj),
+            "_path": (),
             "schema": property(lambda cls: cls._schema),
             "validator": property(lambda cls: cls._validator),
             "__bool__": DataMeta.cls_validate}
 
-        return type(name, bases, dct)
+        with _REGISTRY_LOCK:
+            return _REGISTRY.setdefault(key, type(name, bases, dct))
+
+
+# Functions of data types and instances; they are not methods, so they do not
+# hide data keys of the same names
+validate = DataMeta.cls_validate
+is_valid = DataMeta.cls_is_valid
+errors = DataMeta.cls_errors
+from_many = DataMeta.cls_from_many
+
+
+# The type of nested dictionary proxies, shared by all the data types
+NestedData = type(META_INST_NAME, (object, ), {
+    **DataMeta.METHODS,
+    "__slots__": ("_data", "_root", "_path"),
+    "__init__": DataMeta.cls_init_nested,
+    "__deepcopy__": lambda obj, memo: NestedData(copy.deepcopy(obj._data, memo))})
+
+(_NEW_OBJECT, _SET_NESTED_DATA, _SET_NESTED_ROOT, _SET_NESTED_PATH) = (
+    object.__new__,
+    NestedData._data.__set__,  # pylint: disable=W0212
+    NestedData._root.__set__,  # pylint: disable=W0212
+    NestedData._path.__set__)  # pylint: disable=W0212
+
+
+def nested_data(data: dict, root: Any, path: Tuple) -> Any:
+    """A nested dictionary proxy, made without calling Python methods"""
+    proxy = _NEW_OBJECT(NestedData)
+    _SET_NESTED_DATA(proxy, data)
+    _SET_NESTED_ROOT(proxy, root)
+    _SET_NESTED_PATH(proxy, path)
+    return proxy
+
+
+SCHEMA_CLASS_NAME = "SchemaData"
+
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": (list, tuple),
+    "object": dict,
+    "null": type(None)}
+
+_SCHEMA_CLASS_METHODS = {"to_dict", "from_dict", "is_valid", "keys", "items"}
+
+
+def _type_checker(name: str, schema: Any, nested: Optional[type]) -> Callable[[Any], Any]:
+    """A function checking a property value type, returns the value to be set"""
+    types = schema.get("type") if isinstance(schema, dict) else None
+    types = [types] if isinstance(types, str) else types
+    py_types = None if types is None else tuple(_JSON_TYPES[t] for t in types if t in _JSON_TYPES)
+    (b_bool, b_int) = (types is None or "boolean" in types, types is not None and "integer" in types)
+
+    def check(value):
+        if nested is not None:
+            if isinstance(value, nested):
+                return value
+            if isinstance(value, dict):
+                return nested.from_dict(value)
+        if py_types is None:
+            return value
+        if isinstance(value, bool) and not b_bool:
+            raise TypeError(f"Property `{name}` must be of {'/'.join(types)} type: {value!r}")
+        if isinstance(value, py_types) or (b_int and isinstance(value, float) and value.is_integer()):
+            return value
+        raise TypeError(f"Property `{name}` must be of {'/'.join(types)} type: {value!r}")
+
+    return check
+
+
+def _copy_defaults(value: Any, defaults: Set[int]) -> Any:
+    """The value with the default containers in it copied; dictionaries
+    joined with the default ones are changed in place"""
+    if id(value) in defaults:
+        return copy.deepcopy(value)
+    if isinstance(value, dict):
+        for (key, item) in value.items():
+            if not isinstance(item, _ATOMIC_TYPES):
+                value[key] = _copy_defaults(item, defaults)
+    return value
+
+
+def _plain(value: Any) -> Any:
+    """Generated class instances as dictionaries"""
+    return value.to_dict() if hasattr(type(value), "_schema_class") else value
+
+
+def SchemaClass(schema: dict, default_data: Optional[dict]=None, name: Optional[str]=None) -> type:
+    """
+    Create a class with a slot per schema property; nested object schemas
+    with properties become nested classes.
+
+    Values are type checked when set, dictionaries given for nested objects
+    are converted; unset properties are None. Properties not in the schema
+    are kept aside unless `additionalProperties` is false.
+
+    Arguments:
+        default_data: (dict) the default values, joined with the data
+            given as `dict_join` does
+    """
+    # pylint: disable=C0103
+    schema = copy.deepcopy(schema)
+    default_data = copy.deepcopy(default_data or {})
+    name = name or schema.get("title") or SCHEMA_CLASS_NAME
+    properties = schema.get("properties", {})
+    b_extra = schema.get("additionalProperties", True) is not False
+
+    for prop in properties:
+        if not prop.isidentifier() or prop.startswith("_") or prop in _SCHEMA_CLASS_METHODS:
+            raise ValueError(f"Property `{prop}` can not be a `{name}` attribute")
+
+    default_ids = frozenset(node_ids(default_data))
+    checkers = {}
+    for (prop, sub) in properties.items():
+        nested = None
+        if isinstance(sub, dict) and "properties" in sub and sub.get("type", "object") == "object":
+            nested = SchemaClass(sub, default_data.get(prop), f"{name}_{prop}")
+        checkers[prop] = _type_checker(prop, sub, nested)
+
+    def cls_init(obj, data=None):
+        assert isinstance(data or {}, dict), "Data given is not a dictionary: %r" % repr(data)
+        object.__setattr__(obj, "_extra", {})
+        for (key, value) in dict_join(default_data, data or {}).items():
+            # NOTE: the default values are not shared, also the ones joined
+            # with the data given into nested dictionaries
+            if not isinstance(value, _ATOMIC_TYPES):
+                value = _copy_defaults(value, default_ids)
+            setattr(obj, key, value)
+
+    def cls_setattr(obj, key, value):
+        if (check := checkers.get(key)) is not None:
+            object.__setattr__(obj, key, check(value))
+        elif key[0] != "_" and b_extra:
+            obj._extra[key] = value
+        else:
+            raise AttributeError(f"`{name}` has no property `{key}`")
+
+    def cls_getattr(obj, key):
+        """unset properties and others"""
+        if key[0] == "_":
+            raise AttributeError(key)
+        return obj._extra.get(key)
+
+    def cls_getitem(obj, key):
+        if key in members:
+            try:
+                return _plain(members[key].__get__(obj))
+            except AttributeError:
+                raise KeyError(key) from None
+        return obj._extra[key]
+
+    def items(obj) -> Iterator[Tuple[str, Any]]:
+        """set properties and their values"""
+        for (prop, member) in members.items():
+            try:
+                yield (prop, member.__get__(obj))
+            except AttributeError:
+                pass
+        yield from obj._extra.items()
+
+    cls = type(name, (object, ), {
+        "__slots__": (*properties, "_extra"),
+        "__init__": cls_init,
+        "__setattr__": cls_setattr,
+        "__getattr__": cls_getattr,
+        "__getitem__": cls_getitem,
+        "__repr__": lambda obj: f"{name}({obj.to_dict()!r})",
+        "__eq__": lambda obj, other: type(obj) is type(other) and obj.to_dict() == other.to_dict(),
+        "_schema_class": True,
+        "_schema": schema,
+        "_default_data": default_data,
+        "_validator": compile_validator(schema),
+        "items": items,
+        "keys": lambda obj: [key for (key, _) in obj.items()],
+        "to_dict": lambda obj: {key: _plain(value) for (key, value) in obj.items()},
+        "from_dict": classmethod(lambda cls, data: cls(data)),
+        "is_valid": lambda obj: obj._validator.is_valid(obj.to_dict())})
+
+    # slot descriptors
+    members = {prop: cls.__dict__[prop] for prop in properties}
+    return cls
+
 
 def test_meta_data_object():
     """Testing meta data objects"""
 
+
+def test_nested_data():
+    """Testing nested dictionary proxies"""
+
+    inst = DataMeta()({"a": {"b": {"c": 1}}})
+
+    assert type(inst.a) is type(inst.a.b) is NestedData  # pylint: disable=C0123
+    assert inst.a.b.c == 1 and inst.a.x is None
+
+    inst.a.b.c = 2
+    inst.a.d = inst.a.b
+    assert inst["a"] == {"b": {"c": 2}, "d": {"c": 2}}
+
+    nested = copy.deepcopy(inst.a)
+    nested.b.c = 3
+    assert inst.a.b.c == 2 and nested.b.c == 3
+
+
+def test_incremental_validation():
+    """Testing validation of changed subtrees"""
+
+    schema = {
+        "type": "object",
+        "properties": {
+            "a": {
+                "type": "object",
+                "properties": {"b": {"type": "integer"}, "c": {"type": "integer"}},
+                "additionalProperties": False}}}
+    inst = DataMeta(schema)({"a": {"b": 1, "c": 2}})
+    assert inst and inst._dirty == set()  # pylint: disable=W0212
+
+    inst.a.b = 2
+    inst.a["c"] = 3
+    assert inst._dirty == {("a", "b"), ("a", "c")}  # pylint: disable=W0212
+    assert inst
+
+    inst["a"]["c"] = "1"
+    assert not inst
+
+    inst["a"]["c"] = 3
+    assert inst
+    inst.a.d = 1
+    assert inst._dirty == {("a", )} and not inst  # pylint: disable=W0212
+
+    inst = DataMeta({"properties": {"l": {"type": "array", "items": {"type": "integer"}}}})(
+        {"l": [1]})
+    assert inst
+    inst.l.append("1")
+    assert inst._dirty == {("l", )} and not inst  # pylint: disable=W0212
+
+    assert sub_schema({"items": {"type": "string"}}, 3) == {"type": "string"}
+    assert sub_schema({"allOf": [], "properties": {"a": {}}}, "a") is None
+
+
+def test_copy_on_write_defaults():
+    """Testing the default data shared by instances"""
+
+    default_data = {"a": {"b": {"c": 1}, "d": [1]}, "e": {"f": 2}}
+    cls = DataMeta(None, default_data)
+    (x, y) = (cls(), cls({"a": {"d": [2]}}))
+
+    assert x._data["e"] is y._data["e"] is cls._default_data["e"]  # pylint: disable=W0212
+    assert dict(y) == dict_join(copy.deepcopy(default_data), {"a": {"d": [2]}})
+
+    nested = x.a.b
+    x.a.b.c = 3
+    assert nested.c == 3 and x.a.b.c == 3 and y.a.b.c == 1
+    assert x._data["e"] is cls._default_data["e"]  # pylint: disable=W0212
+
+    z = DataMeta(None, {"z": 1})()
+    z.a = cls().a
+    z.a.b.c = 5
+    z.e = x.e
+    z.e.f = 5
+    assert cls._default_data == default_data  # pylint: disable=W0212
+    assert cls().a.b.c == 1 and x.e.f == 5
+
+    x["e"]["f"] = 4
+    x.a.d.append(2)
+    assert (x.e.f, x.a.d) == (4, [1, 2]) and (y.e.f, cls().a.d) == (2, [1])
+    assert cls._default_data == default_data  # pylint: disable=W0212
+
+    # a proxy kept after its subtree is replaced keeps the old subtree
+    x = cls()
+    (old_a, old_b) = (x.a, x.a.b)
+    x.a = {"q": 1}
+    old_a.f = 9
+    old_b.c = 7
+    assert dict(x) == {"a": {"q": 1}, "e": {"f": 2}}
+    assert (old_a.f, old_a.b.c, old_a["b"]["c"], old_b.c, old_a["d"]) == (9, 7, 7, 7, [1])
+    assert cls._default_data == default_data  # pylint: disable=W0212
+
+
+def test_from_many():
+    """Testing the bulk construction"""
+
+    cls = DataMeta(
+        {"type": "object", "properties": {"a": {"type": "integer"}}, "required": ["a"]},
+        {"b": 1})
+    rows = [{"a": 1}, {"a": "1"}, {}, "x", {"a": 2}]
+
+    for workers in [1, 2]:
+        res = list(from_many(cls, rows, workers=workers, chunk_size=2))
+        assert [r.value["a"] for r in res if r] == [1, 2]
+        assert [r.value.b for r in res if r] == [1, 1]
+        assert [(r.value.index, r.value.errors[0].split(":")[0]) for r in res if not r] == \
+            [(1, "a"), (2, "'a' is a required property"), (3, "AssertionError")]
+
+    assert len([r for r in from_many(cls, rows, validate=False) if r]) == 4
+
+
+def test_schema_class():
+    """Testing classes generated by schemas"""
+
+    schema = {
+        "type": "object",
+        "properties": {
+            "a": {
+                "type": "object",
+                "properties": {"b": {"type": "integer"}, "c": {"type": ["string", "null"]}}},
+            "d": {"type": "array"}}}
+    Data = SchemaClass(schema, {"a": {"b": 1}, "d": [1]})  # pylint: disable=C0103
+
+    x = Data({"a": {"c": "c"}, "e": 2})
+    assert (x.a.b, x.a.c, x.d, x.e, x.f) == (1, "c", [1], 2, None)
+    assert x.to_dict() == dict(x) == dict_join({"a": {"b": 1}, "d": [1]}, {"a": {"c": "c"}, "e": 2})
+    assert Data.from_dict(x.to_dict()) == x and x.is_valid()
+
+    x.d.append(2)
+    assert Data().d == [1] and Data().a.c is None and "c" not in Data().a.keys()
+
+    x.a = {"b": 2}
+    assert x.a.to_dict() == {"b": 2}
+
+    # nested defaults joined with the data given are not shared
+    Data = SchemaClass({  # pylint: disable=C0103
+        "type": "object",
+        "properties": {"a": {"type": "object", "properties": {"l": {}, "b": {}}}}},
+        {"a": {"l": [1], "b": 1}})
+    y = Data({"a": {"b": 2}})
+    y.a.l.append(2)
+    assert (y.a.l, Data().a.l, Data({"a": {"b": 3}}).a.l) == ([1, 2], [1], [1])
+    assert Data._default_data == {"a": {"l": [1], "b": 1}}  # pylint: disable=W0212
+    for (attr, value) in [("b", "1"), ("b", True), ("c", 1)]:
+        try:
+            setattr(x.a, attr, value)
+            assert False, f"{value!r} accepted"
+        except TypeError:
+            pass
+
+
+def test_type_registry():
+    """Testing interning of types"""
+
+    registry_clear()
+    schema = {"type": "object", "properties": {"a": {"type": "integer"}}}
+
+    cls = DataMeta(schema, {"a": 1})
+    assert DataMeta(copy.deepcopy(schema), {"a": 1}) is cls
+    assert DataMeta(schema, {"a": 2}) is not cls
+    assert DataMeta(schema, {1: 1}) is not DataMeta(schema, {"1": 1})
+
+    schema["properties"]["a"]["type"] = "string"
+    assert DataMeta(schema, {"a": 1}) is not cls
+    assert cls({"a": 1})
+
+    stats = registry_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 5)
+
+
+def test_compiled_validator():
+    """Testing validation with the compiled validator"""
+
+    schema = {
+        "type": "object",
+        "properties": {
+            "a": {"type": "integer"},
+            "b": {"type": "array", "items": {"type": "string"}}}}
+    cls = DataMeta(schema, {"a": 1})
+
+    assert cls({"b": ["x"]}) and is_valid(cls({"b": ["x"]}))
+
+    inst = cls({"a": "1", "b": ["x", 2]})
+    assert not inst and not is_valid(inst)
+    assert [list(err.absolute_path) for err in errors(inst)] == [["a"], ["b", 1]]
+    assert not validate(inst, full=True)
+
+    inst = DataMeta()({"errors": [1], "validate": True, "is_valid": 1, "from_many": 2})
+    assert (inst.errors, inst.validate, inst.is_valid, inst.from_many) == ([1], True, 1, 2)
+
+    try:
+        DataMeta({"type": 1})
+        assert False, "invalid schema accepted"
+    except jsonschema.SchemaError:
+        pass
+
 if __name__ == "__main__":
     test_meta_data_object()
@@ -3,79 +3,295 @@ file: simple_log.py
 author: Nikolay S. Vasil'ev
 description: a simple logger implementation; this is used when a usual logger
     is not rational or may not applied
+
+Records are written to stderr through a per-thread buffer, which is flushed
+when it exceeds `BUFFER_SIZE`, a warning or an error comes, the thread ends or
+at exit; a daemon thread flushes buffers once `FLUSH_INTERVAL` passed since
+their first record, so records of an idle thread are not held back.
 """
+import os
 import sys
+import weakref
 
-from functools import partial
-from typing import Callable
+from time import monotonic, sleep
+from threading import local, Lock, Thread
 from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List
 
 # pylint: disable=W0603
 
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+BUFFER_SIZE = 8*1024
+FLUSH_INTERVAL = 0.5
+
 SLOG = False
 SLOG_DEBUG = False
 SLOG_INFO = False
 
+ERROR_CLR = 31
+WARNING_CLR = 33
+INFO_CLR = 35
+DEBUG_CLR = 36
+
+_PREFIXES = {
+    level: f"\033[1;40;{clr}m[{tag}] \033[m\033[0;40;{clr}m"
+    for (level, tag, clr) in [
+        (DEBUG, "DEBUG", DEBUG_CLR),
+        (INFO, "INFO", INFO_CLR),
+        (WARNING, "WARNING", WARNING_CLR),
+        (ERROR, "ERROR", ERROR_CLR)]}
+
+# the level set by `enable_*`/`disable_*` functions
+_LEVEL = OFF
+# the level set by `enabled` in the current context
+_CONTEXT_LEVEL: ContextVar[Optional[int]] = ContextVar("simple_log_level", default=None)
+# levels of all the `enabled` blocks being executed
+_CONTEXT_LEVELS: List[int] = []
+# nothing below this level is logged in any context
+_MIN_LEVEL = OFF
+_LOCK = Lock()
+
+
+def _update_levels():
+    global _LEVEL, _MIN_LEVEL
+
+    if not SLOG:
+        _LEVEL = OFF
+    elif SLOG_DEBUG:
+        _LEVEL = DEBUG
+    elif SLOG_INFO:
+        _LEVEL = INFO
+    else:
+        _LEVEL = WARNING
+
+    _MIN_LEVEL = min([_LEVEL, *_CONTEXT_LEVELS])
+
+
+def _write(parts: List[str], lock: Lock):
+    # NOTE: the owner thread appends records without the lock, so only the
+    # parts taken are removed
+    with lock:
+        if n_parts := len(parts):
+            sys.stderr.write("".join(parts[:n_parts]))
+            sys.stderr.flush()
+            del parts[:n_parts]
+
+
+class _Buffer:
+    """
+    A thread output buffer, written by the owner thread, the flusher thread,
+    when garbage collected or at exit
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+        self.since = 0.0
+        self.lock = Lock()
+        weakref.finalize(self, _write, self.parts, self.lock)
+
+    def flush(self):
+        self.size = 0
+        _write(self.parts, self.lock)
+
+
+_THREAD = local()
+# buffers of the live threads
+_BUFFERS: "weakref.WeakSet[_Buffer]" = weakref.WeakSet()
+_FLUSHER: Optional[Thread] = None
+
+
+def _flush_stale():
+    """Flush buffers with records older than `FLUSH_INTERVAL`, forever"""
+    while True:
+        sleep(FLUSH_INTERVAL/2)
+        now = monotonic()
+        for buf in list(_BUFFERS):
+            if buf.parts and now - buf.since >= FLUSH_INTERVAL:
+                buf.flush()
+
+
+def _start_flusher():
+    global _FLUSHER
+    _FLUSHER = Thread(target=_flush_stale, name="simple_log flusher", daemon=True)
+    _FLUSHER.start()
+
+
+def _restart_flusher():
+    # the flusher thread does not survive a fork, buffers do; locks are reset
+    # as `logging` does for handlers, they may be held by a thread left behind;
+    # records buffered before the fork are the parent's to write
+    _LOCK._at_fork_reinit()  # pylint: disable=W0212
+    for buf in _BUFFERS:
+        buf.lock._at_fork_reinit()  # pylint: disable=W0212
+        buf.parts.clear()
+        buf.size = 0
+    if _FLUSHER is not None:
+        _start_flusher()
+
+
+os.register_at_fork(after_in_child=_restart_flusher)
+
+
+def _buffer() -> _Buffer:
+    try:
+        return _THREAD.buffer
+    except AttributeError:
+        pass
 
-def _simple_log(relax_checker: Callable[[], bool], tag: str, clr: int, msg: str, /, *a):
+    _THREAD.buffer = buf = _Buffer()
+    with _LOCK:
+        _BUFFERS.add(buf)
+        if _FLUSHER is None:
+            _start_flusher()
+    return buf
 
-    if relax_checker():
+
+def _simple_log(level: int, msg: str, a: tuple):
+
+    if (ctx_level := _CONTEXT_LEVEL.get()) is None or ctx_level > _LEVEL:
+        ctx_level = _LEVEL
+    if level < ctx_level:
         return
 
-    assert isinstance(clr, int)
+    line = f"{_PREFIXES[level]}{sys.argv[0] or r'>>>'}: " + msg % a + "\033[m\n"
+
+    buf = _buffer()
+    if not buf.parts:
+        buf.since = monotonic()
+    buf.parts.append(line)
+    buf.size += len(line)
+
+    if level >= WARNING or buf.size >= BUFFER_SIZE or monotonic() - buf.since >= FLUSH_INTERVAL:
+        buf.flush()
 
-    print(\
-        f"\033[1;40;{clr}m[{tag}] \033[m\033[0;40;{clr}m" + \
-            f"{sys.argv[0] or r'>>>'}: " + msg % a + "\033[m",
-        file=sys.stderr)
+
+def flush():
+    """Write the current thread buffer"""
+    _buffer().flush()
 
 
 def enable_simple_log():
     global SLOG
     SLOG = True
+    _update_levels()
 
 def enable_simple_log_debug():
     global SLOG_DEBUG
     SLOG_DEBUG = True
+    _update_levels()
 
 def enable_simple_log_info():
     global SLOG_INFO
     SLOG_INFO = True
+    _update_levels()
 
 def disable_simple_log():
     global SLOG
-    SLOG = True
+    SLOG = False
+    _update_levels()
 
 def disable_simple_log_debug():
     global SLOG_DEBUG
-    SLOG_DEBUG = True
+    SLOG_DEBUG = False
+    _update_levels()
 
 def disable_simple_log_info():
     global SLOG_INFO
-    SLOG_INFO = True
-
-
-ERROR_CLR = 31
-WARNING_CLR = 33
-INFO_CLR = 35
-DEBUG_CLR = 36
+    SLOG_INFO = False
+    _update_levels()
 
 
 @contextmanager
 def enabled(b_debug: bool=False):
-    global SLOG, SLOG_INFO, SLOG_DEBUG
+    """Enable info (and debug) records for the current thread or asyncio task"""
 
-    (old_slog, old_slog_info, old_slog_debug) = (SLOG, SLOG_INFO, SLOG_DEBUG)
-    SLOG = True
-    SLOG_INFO = True
-    SLOG_DEBUG = b_debug or old_slog_debug
+    level = DEBUG if b_debug else INFO
+    if (outer_level := _CONTEXT_LEVEL.get()) is not None:
+        level = min(level, outer_level)
+
+    with _LOCK:
+        _CONTEXT_LEVELS.append(level)
+        _update_levels()
+    token = _CONTEXT_LEVEL.set(level)
+
+    try:
+        yield
+    finally:
+        _CONTEXT_LEVEL.reset(token)
+        with _LOCK:
+            _CONTEXT_LEVELS.remove(level)
+            _update_levels()
+        flush()
+
+
+def debug(msg: str, /, *a):
+    if DEBUG < _MIN_LEVEL:
+        return
+    _simple_log(DEBUG, msg, a)
+
+def info(msg: str, /, *a):
+    if INFO < _MIN_LEVEL:
+        return
+    _simple_log(INFO, msg, a)
+
+def warning(msg: str, /, *a):
+    if WARNING < _MIN_LEVEL:
+        return
+    _simple_log(WARNING, msg, a)
+
+def error(msg: str, /, *a):
+    if ERROR < _MIN_LEVEL:
+        return
+    _simple_log(ERROR, msg, a)
+
+
+def test_periodic_flush(capsys, monkeypatch):
+    """testing records of an idle thread are written after `FLUSH_INTERVAL`"""
+
+    monkeypatch.setitem(globals(), "FLUSH_INTERVAL", 0.05)
+    monkeypatch.setitem(globals(), "SLOG", True)
+    monkeypatch.setitem(globals(), "SLOG_INFO", True)
+    _update_levels()
+
+    try:
+        info("idle %d", 1)
+        t = monotonic()
+        while "idle 1" not in capsys.readouterr().err:
+            assert monotonic() - t < 1.0
+            sleep(0.01)
+    finally:
+        monkeypatch.undo()
+        _update_levels()
 
-    yield
 
-    (SLOG, SLOG_INFO, SLOG_DEBUG) = (old_slog, old_slog_info, old_slog_debug)
+def test_fork_drops_parent_records(monkeypatch):
+    """testing a forked child does not write records buffered by the parent"""
 
+    monkeypatch.setitem(globals(), "FLUSH_INTERVAL", 60.0)
+    monkeypatch.setitem(globals(), "SLOG", True)
+    monkeypatch.setitem(globals(), "SLOG_INFO", True)
+    _update_levels()
 
-debug = partial(_simple_log, lambda: not (SLOG and SLOG_DEBUG), "DEBUG", DEBUG_CLR)
-info = partial(_simple_log, lambda: not (SLOG and (SLOG_DEBUG or SLOG_INFO)), "INFO", INFO_CLR)
-warning = partial(_simple_log, lambda: not SLOG, "WARNING", WARNING_CLR)
-error = partial(_simple_log, lambda: not SLOG, "ERROR", ERROR_CLR)
+    try:
+        info("parent")
+        (r_fd, w_fd) = os.pipe()
+        if (pid := os.fork()) == 0:
+            os.close(r_fd)
+            os.write(w_fd, b"%d" % len(_buffer().parts))
+            os._exit(0)
+        os.close(w_fd)
+        with os.fdopen(r_fd, 'rb') as fid:
+            assert fid.read() == b"0"
+        os.waitpid(pid, 0)
+        assert len(_buffer().parts) == 1
+    finally:
+        monkeypatch.undo()
+        _update_levels()
+        flush()
@@ -9,7 +9,7 @@ from threading import Thread
 from concurrent.futures import Future
 from enum import Enum
 
-from .log import get_logger
+from .log import get_logger, flush_ring_buffers
 from .wrappers import wrap_in_either
 
 LOG = get_logger()
@@ -63,6 +63,7 @@ def thread_executable(f):
 
         if not (res := wrap_in_either(f)(*a, **k)):
             LOG.error("Promise handler failed: %s", res.value)
+            flush_ring_buffers(LOG)
             raise ThreadHandlerError(f"handler: {f}, arguments: {a}, {k}")
 
         LOG.debug("Promise handler returned: %s", res.value)